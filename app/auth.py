@@ -1,10 +1,22 @@
 # app/auth.py
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import binascii
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import hashlib
+import hmac
+import json
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
 
 # .env 로드
@@ -18,49 +30,189 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
 # 기본 토큰 만료 시간 (분)
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
-# 비밀번호 해싱 설정 (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 디코딩된 토큰 payload 캐시 (exp 까지 재사용, 최대 개수 초과 시 오래된 것부터 제거)
+TOKEN_CACHE_MAX_SIZE = 2048
+
+_TOKEN_CACHE: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# 비밀번호 해싱 설정
+# - 신규 해시는 argon2id (서버 측 수십 ms 수준으로 튜닝)
+# - bcrypt_sha256 은 SHA-256 선해싱으로 72바이트 제한이 없다.
+# - 기존 bcrypt 해시도 그대로 검증되며, needs_update() 로 다음 로그인 때 교체할 수 있다.
+# cost 12(라이브러리 기본값)는 1회 ~250ms 수준이라 bcrypt 계열 기본값은 10으로 둔다.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
+
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+    bcrypt_sha256__rounds=BCRYPT_ROUNDS,
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+# 검증 성공 결과 캐시 (TTL + LRU)
+# 키는 (sha256(평문), 해시) 이므로 평문 비밀번호는 메모리에 남기지 않는다.
+PASSWORD_VERIFY_CACHE_TTL = int(os.getenv("PASSWORD_VERIFY_CACHE_TTL", "60"))
+
+_verify_cache: TTLCache = TTLCache(maxsize=1024, ttl=PASSWORD_VERIFY_CACHE_TTL)
+_verify_cache_lock = threading.Lock()
+
+# 비밀번호 해싱은 CPU 바운드라 이벤트 루프를 막지 않도록 전용 스레드풀에서 돌린다.
+_BCRYPT_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 2))),
+    thread_name_prefix="bcrypt",
+)
 
 
 # ==========================
 # 비밀번호 관련 함수
 # ==========================
-MAX_BCRYPT_BYTES = 72
-
-
-def _truncate_for_bcrypt(password: str) -> str:
+def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    bcrypt는 최대 72바이트까지 지원한다.
-    해싱/검증 모두에서 동일한 규칙으로 비밀번호를 잘라서 사용한다.
-    여기서는 간단하게 최대 72자까지 자른다.
+    사용자가 입력한 평문 비밀번호와, DB에 저장된 해시 비밀번호를 비교.
+    해시 방식(argon2 / bcrypt_sha256 / bcrypt)은 passlib 이 자동으로 판별한다.
+    TTL 안에 같은 조합으로 검증에 성공한 적이 있으면 bcrypt를 건너뛴다. (실패는 캐시하지 않음)
     """
-    if len(password) > MAX_BCRYPT_BYTES:
-        return password[:MAX_BCRYPT_BYTES]
-    return password
+    cache_key = (
+        hashlib.sha256(plain_password.encode("utf-8")).digest(),
+        hashed_password,
+    )
+    with _verify_cache_lock:
+        if cache_key in _verify_cache:
+            return True
 
+    verified = pwd_context.verify(plain_password, hashed_password)
+    if verified:
+        with _verify_cache_lock:
+            _verify_cache[cache_key] = True
+    return verified
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
     """
-    사용자가 입력한 평문 비밀번호와, DB에 저장된 해시 비밀번호를 비교.
-    bcrypt의 72바이트 제한에 맞추기 위해 동일한 규칙으로 잘라서 비교한다.
+    verify_password 와 같지만, 검증에 성공했고 저장된 해시가 현재 정책(argon2id / 현재 cost)과
+    다르면 새 해시를 함께 반환한다. → (검증 결과, 새 해시 또는 None)
     """
-    plain_password = _truncate_for_bcrypt(plain_password)
-    return pwd_context.verify(plain_password, hashed_password)
+    cache_key = (
+        hashlib.sha256(plain_password.encode("utf-8")).digest(),
+        hashed_password,
+    )
+    with _verify_cache_lock:
+        if cache_key in _verify_cache:
+            return True, None
+
+    verified, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if verified:
+        with _verify_cache_lock:
+            _verify_cache[cache_key] = True
+    return verified, new_hash
 
 
 def get_password_hash(password: str) -> str:
     """
-    평문 비밀번호를 bcrypt로 해싱해서 반환.
-    DB에는 잘린 비밀번호(동일 규칙 적용 후)의 해시값만 저장한다.
+    평문 비밀번호를 기본 방식(argon2id)으로 해싱해서 반환.
     """
-    password = _truncate_for_bcrypt(password)
     return pwd_context.hash(password)
 
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """verify_password 를 bcrypt 스레드풀에서 실행하는 비동기 버전."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _BCRYPT_POOL, verify_password, plain_password, hashed_password
+    )
+
+
+async def averify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password 를 bcrypt 스레드풀에서 실행하는 비동기 버전."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _BCRYPT_POOL, verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    """get_password_hash 를 bcrypt 스레드풀에서 실행하는 비동기 버전."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_POOL, get_password_hash, password)
+
+
 # ==========================
 # JWT 관련 함수
 # ==========================
+# HS256 전용 빠른 경로: SECRET_KEY 로 초기화한 HMAC 상태를 한 번만 만들고 매번 copy() 해서 쓴다.
+# (다른 알고리즘을 쓰도록 설정하면 PyJWT 로 처리)
+def _b64url_encode(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+_HS256_HEADER_B64 = _b64url_encode(
+    json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode()
+)
+_HMAC_TEMPLATE = hmac.new(SECRET_KEY.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _sign_hs256(signing_input: bytes) -> bytes:
+    mac = _HMAC_TEMPLATE.copy()
+    mac.update(signing_input)
+    return _b64url_encode(mac.digest())
+
+
+def _encode_hs256(payload: Dict[str, Any]) -> str:
+    payload_b64 = _b64url_encode(
+        json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    )
+    signing_input = _HS256_HEADER_B64 + b"." + payload_b64
+    return (signing_input + b"." + _sign_hs256(signing_input)).decode("ascii")
+
+
+def _decode_hs256(token: str) -> Optional[Dict[str, Any]]:
+    """서명/exp/nbf 를 검증하고 payload 를 반환. 유효하지 않으면 None."""
+    try:
+        header_b64, payload_b64, signature = token.encode("ascii").split(b".")
+    except (UnicodeEncodeError, ValueError):
+        return None
+
+    expected = _sign_hs256(header_b64 + b"." + payload_b64)
+    if not hmac.compare_digest(expected, signature):
+        return None
+
+    try:
+        header = json.loads(_b64url_decode(header_b64))
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (binascii.Error, ValueError):
+        return None
+
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        return None
+    if not isinstance(payload, dict):
+        return None
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        return None
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+        return None
+
+    return payload
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None,
@@ -71,12 +223,16 @@ def create_access_token(
     """
     to_encode = data.copy()
 
+    # exp 는 NumericDate(epoch 초) 이므로 datetime 을 거치지 않고 바로 계산한다.
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        ttl = int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ttl = ACCESS_TOKEN_EXPIRE_SECONDS
 
-    to_encode.update({"exp": expire})
+    to_encode["exp"] = int(time.time()) + ttl
+
+    if ALGORITHM == "HS256":
+        return _encode_hs256(to_encode)
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -86,9 +242,38 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
     JWT 토큰을 디코딩하여 payload(dict)를 반환.
     유효하지 않으면 None을 반환.
+    같은 토큰은 exp 전까지 캐시된 payload 를 그대로 돌려준다.
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+    now = time.time()
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(token)
+    if cached is not None:
+        payload, exp = cached
+        if exp > now:
+            return payload
+        invalidate_token(token)
+
+    if ALGORITHM == "HS256":
+        payload = _decode_hs256(token)
+        if payload is None:
+            return None
+    else:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except InvalidTokenError:
+            return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > now:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[token] = (payload, float(exp))
+            while len(_TOKEN_CACHE) > TOKEN_CACHE_MAX_SIZE:
+                _TOKEN_CACHE.popitem(last=False)
+
+    return payload
+
+
+def invalidate_token(token: str) -> None:
+    """로그아웃 등에서 캐시된 토큰 payload 를 제거."""
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE.pop(token, None)
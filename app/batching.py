@@ -0,0 +1,129 @@
+# app/batching.py
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+
+# ==========================
+# 마이크로 배칭 (짧은 시간 창 동안 들어온 요청을 모아 한 번에 처리)
+# ==========================
+class MicroBatcher:
+    """
+    submit() 으로 들어온 항목을 최대 batch_wait_timeout_s 동안(또는 max_batch_size 개까지) 모아서
+    handler(items) 를 한 번 호출하고, 결과를 각 호출자에게 돌려준다.
+
+    - handler 는 items 와 같은 순서/길이의 결과 리스트를 반환해야 한다.
+      결과 자리에 예외 인스턴스가 있으면 해당 호출자에게 예외로 전달된다.
+    - 배치 처리는 별도 task 로 띄우므로, 느린 배치가 다음 배치 수집을 막지 않는다.
+    - batch_wait_timeout_s=0 이면 기다리지 않고, 이미 큐에 쌓여 있는 항목만 함께 묶는다.
+    - aclose() 때 아직 처리되지 않은 항목의 호출자에게는 RuntimeError 가 전달된다. (무한 대기 방지)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        *,
+        max_batch_size: int = 4,
+        batch_wait_timeout_s: float = 0.0,
+    ) -> None:
+        self._handler = handler
+        self._max_batch_size = max(1, max_batch_size)
+        self._batch_wait_timeout_s = batch_wait_timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """항목 하나를 큐에 넣고, 배치 처리 결과가 나올 때까지 기다린다."""
+        self._ensure_worker()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    async def aclose(self) -> None:
+        """수집 task 를 멈추고 진행 중인 배치가 끝날 때까지 기다린다. (앱 shutdown 시 호출)"""
+        worker = self._worker
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        # 기다리는 사이 submit() 이 새 수집 task 를 띄웠다면 그 task/큐는 그대로 둔다.
+        if self._worker is worker:
+            self._worker = None
+            self._queue = None
+
+    # --------------------------
+    # 내부 구현
+    # --------------------------
+    def _ensure_worker(self) -> None:
+        # 이벤트 루프가 바뀐 경우(워커 재시작 등)에도 새 루프에서 다시 시작되도록 한다.
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch: List[Tuple[Any, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self._batch_wait_timeout_s
+
+                while len(batch) < self._max_batch_size:
+                    # 이미 쌓여 있는 항목은 기다리지 않고 바로 묶는다.
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                task = loop.create_task(self._dispatch(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # 모으던 배치와 큐에 남은 항목의 호출자가 영원히 기다리지 않도록 실패로 끝낸다.
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            _fail_pending(batch, RuntimeError("MicroBatcher 가 종료되어 요청을 처리하지 못했습니다."))
+            raise
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await self._handler(items)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        if len(results) != len(batch):
+            # handler 계약 위반: 남는 호출자가 생기지 않도록 전부 실패 처리
+            _fail_pending(
+                batch,
+                RuntimeError(
+                    f"batch handler 가 {len(batch)}개 항목에 {len(results)}개 결과를 반환했습니다."
+                ),
+            )
+            return
+
+        for (_, fut), result in zip(batch, results):
+            if fut.done():  # 호출자가 이미 취소된 경우
+                continue
+            if isinstance(result, BaseException):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+
+def _fail_pending(batch: List[Tuple[Any, asyncio.Future]], exc: BaseException) -> None:
+    for _, fut in batch:
+        if not fut.done():
+            fut.set_exception(exc)
@@ -1,18 +1,93 @@
 # app/crud.py
-from typing import Optional, List
+from typing import Any, AsyncIterator, NamedTuple, Optional, List, Sequence, Set, Tuple
 from datetime import datetime
+import asyncio
 import json
 
-from sqlalchemy import select, or_
+import orjson
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, select, or_, text, tuple_, update
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import models, schemas
-from .auth import get_password_hash, verify_password
+from .auth import aget_password_hash, averify_and_update_password
+from .database import AsyncSessionLocal
+
+
+# ==========================
+# 자주 쓰는 SELECT 문 (모듈 로드 시 한 번만 구성)
+# ==========================
+_STMT_USER_BY_EMAIL = select(models.User).where(
+    models.User.email == bindparam("email")
+)
+
+_STMT_LOGIN_BY_EMAIL = select(models.User.id, models.User.hashed_password).where(
+    models.User.email == bindparam("email")
+)
+
+_STMT_USER_ARTICLES = (
+    select(models.Article)
+    .where(models.Article.user_id == bindparam("user_id"))
+    .order_by(models.Article.created_at.desc())
+    .limit(bindparam("limit"))
+)
+
+_STMT_USER_MONITORED_KEYWORDS = (
+    select(models.MonitoredKeyword)
+    .where(models.MonitoredKeyword.user_id == bindparam("user_id"))
+    .order_by(models.MonitoredKeyword.last_checked_at.desc())
+    .limit(bindparam("limit"))
+)
+
+_STMT_USER_IMPROVEMENT_REQUESTS = (
+    select(models.ImprovementRequest)
+    .where(models.ImprovementRequest.user_id == bindparam("user_id"))
+    .order_by(models.ImprovementRequest.created_at.desc())
+    .limit(bindparam("limit"))
+)
+
+_STMT_IMPROVEMENT_REQUEST_BY_ID = (
+    select(models.ImprovementRequest)
+    .where(models.ImprovementRequest.id == bindparam("request_id"))
+    .limit(1)
+)
 
 
 # ==========================
 # User 관련 CRUD
 # ==========================
+class CachedUser(NamedTuple):
+    """인증 캐시에 담는 유저 스냅샷.
+
+    ORM User 인스턴스는 조회한 요청의 세션에 묶여 있어서, 다른 요청/세션에서 재사용하면
+    lazy load 나 세션 상태가 섞인다. 그래서 인증/화면에 필요한 컬럼만 불변 값으로 복사해 둔다.
+    """
+
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_orm_user(cls, user: models.User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+
+# 인증 의존성에서 매 요청마다 반복되는 user_id 조회를 줄이기 위한 프로세스(워커) 캐시
+# - 워커마다 따로 가지므로, 다른 워커에서 바뀐 유저 정보(is_active 등)는 최대 30초 늦게 반영된다.
+# - 같은 워커 안에서 바꾸는 경우에는 invalidate_user_cache() 로 바로 지운다.
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+
 async def get_user_by_email(
     db: AsyncSession,
     email: str,
@@ -20,9 +95,7 @@ async def get_user_by_email(
     """
     이메일로 유저 한 명 조회
     """
-    result = await db.execute(
-        select(models.User).where(models.User.email == email)
-    )
+    result = await db.execute(_STMT_USER_BY_EMAIL, {"email": email})
     return result.scalar_one_or_none()
 
 
@@ -32,11 +105,35 @@ async def get_user(
 ) -> Optional[models.User]:
     """
     id로 유저 한 명 조회
+    (세션 identity map 에 이미 있으면 SELECT 없이 반환)
     """
-    result = await db.execute(
-        select(models.User).where(models.User.id == user_id)
-    )
-    return result.scalar_one_or_none()
+    return await db.get(models.User, user_id)
+
+
+async def get_user_cached(
+    db: AsyncSession,
+    user_id: int,
+) -> Optional[CachedUser]:
+    """
+    get_user 와 같지만 최근(TTL 30초) 조회된 유저는 DB를 다시 조회하지 않는다.
+    세션에 묶이지 않은 CachedUser 스냅샷을 반환한다. (워커별 캐시라 최대 30초까지 이전 값일 수 있음)
+    """
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = await get_user(db, user_id=user_id)
+    if user is None:
+        return None
+
+    cached = CachedUser.from_orm_user(user)
+    _user_cache[user_id] = cached
+    return cached
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """유저 정보가 바뀌었을 때 캐시된 항목을 제거."""
+    _user_cache.pop(user_id, None)
 
 
 async def create_user(
@@ -46,7 +143,7 @@ async def create_user(
     """
     회원가입: 비밀번호를 해싱한 후 DB에 유저 생성
     """
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await aget_password_hash(user_in.password)
 
     user = models.User(
         email=user_in.email,
@@ -56,9 +153,9 @@ async def create_user(
     )
 
     db.add(user)
+    # id 는 flush 시 채워지고 나머지 기본값은 파이썬 쪽에서 채워지므로
+    # (expire_on_commit=False) commit 후 refresh() 로 다시 SELECT 하지 않는다.
     await db.commit()
-    await db.refresh(user)
-
     return user
 
 
@@ -69,18 +166,51 @@ async def authenticate_user(
 ) -> Optional[models.User]:
     """
     로그인 시 사용:
-    - 이메일로 유저 조회
+    - 이메일로 id/해시만 조회 (ORM 전체 로드 X)
     - 비밀번호 검증
-    둘 다 통과하면 User 반환, 아니면 None
+    둘 다 통과하면 그때 User 를 로드해서 반환, 아니면 None
     """
-    user = await get_user_by_email(db, email=email)
-    if not user:
+    result = await db.execute(_STMT_LOGIN_BY_EMAIL, {"email": email})
+    row = result.one_or_none()
+    if row is None:
         return None
 
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await averify_and_update_password(
+        password, row.hashed_password
+    )
+    if not verified:
         return None
 
-    return user
+    # 예전 방식/비용의 해시라면 로그인 응답을 늦추지 않도록 백그라운드에서 교체
+    if new_hash:
+        _schedule_password_rehash(row.id, new_hash)
+
+    return await get_user(db, user_id=row.id)
+
+
+# 실행 중인 백그라운드 태스크 참조 (GC 로 중간에 사라지지 않도록)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _update_password_hash(user_id: int, hashed_password: str) -> None:
+    """로그인 시 재해싱된 비밀번호를 별도 세션으로 저장."""
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(models.User)
+                .where(models.User.id == user_id)
+                .values(hashed_password=hashed_password)
+            )
+            await session.commit()
+        invalidate_user_cache(user_id)
+    except Exception as e:
+        print(f"[WARN] 비밀번호 해시 갱신 실패 (user_id={user_id}): {e}")
+
+
+def _schedule_password_rehash(user_id: int, hashed_password: str) -> None:
+    task = asyncio.create_task(_update_password_hash(user_id, hashed_password))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 # ==========================
@@ -105,8 +235,8 @@ async def create_article(
     )
 
     db.add(article)
+    # id/created_at 은 flush 시점에 채워진다 (create_user 참고, commit 후 SELECT 없음)
     await db.commit()
-    await db.refresh(article)
 
     return article
 
@@ -120,10 +250,7 @@ async def list_user_articles(
     특정 유저가 생성한 블로그 원고 목록 조회 (최신순)
     """
     result = await db.execute(
-        select(models.Article)
-        .where(models.Article.user_id == user_id)
-        .order_by(models.Article.created_at.desc())
-        .limit(limit)
+        _STMT_USER_ARTICLES, {"user_id": user_id, "limit": limit}
     )
     return result.scalars().all()
 
@@ -151,12 +278,29 @@ async def create_monitored_keyword(
     )
 
     db.add(record)
+    # id/created_at 은 flush 시점에 채워진다 (create_user 참고, commit 후 SELECT 없음)
     await db.commit()
-    await db.refresh(record)
 
     return record
 
 
+async def create_monitored_keywords_bulk(
+    db: AsyncSession,
+    user_id: int,
+    items: List[schemas.MonitoredKeywordCreate],
+) -> List[models.MonitoredKeyword]:
+    """키워드 순위 체크 결과 여러 건을 한 번의 commit 으로 저장."""
+    records = [
+        models.MonitoredKeyword(user_id=user_id, **item.model_dump())
+        for item in items
+    ]
+
+    db.add_all(records)
+    await db.commit()
+
+    return records
+
+
 async def list_user_monitored_keywords(
     db: AsyncSession,
     user_id: int,
@@ -166,12 +310,8 @@ async def list_user_monitored_keywords(
 
     MonitoredKeyword.last_checked_at 기준 내림차순으로 정렬한다.
     """
-
     result = await db.execute(
-        select(models.MonitoredKeyword)
-        .where(models.MonitoredKeyword.user_id == user_id)
-        .order_by(models.MonitoredKeyword.last_checked_at.desc())
-        .limit(limit)
+        _STMT_USER_MONITORED_KEYWORDS, {"user_id": user_id, "limit": limit}
     )
     return result.scalars().all()
 
@@ -185,13 +325,25 @@ def _to_json_text(value) -> Optional[str]:
     if isinstance(value, str):
         return value
 
-    # Pydantic v2 model
+    # Pydantic v2 model: dump + 재직렬화 대신 pydantic-core 가 한 번에 JSON 으로 만든다.
+    if hasattr(value, "model_dump_json"):
+        try:
+            return value.model_dump_json()
+        except Exception:
+            pass
+
     if hasattr(value, "model_dump"):
         try:
             value = value.model_dump()
         except Exception:
             pass
 
+    # orjson 은 UTF-8 그대로(ensure_ascii=False 와 동일) 직렬화한다.
+    try:
+        return orjson.dumps(value).decode("utf-8")
+    except TypeError:
+        pass
+
     try:
         return json.dumps(value, ensure_ascii=False)
     except Exception:
@@ -226,7 +378,6 @@ async def create_improvement_request(
 
     db.add(record)
     await db.commit()
-    await db.refresh(record)
 
     return record
 
@@ -240,10 +391,7 @@ async def list_user_improvement_requests(
     특정 유저의 블로그 분석 요청 목록 조회 (최신순)
     """
     result = await db.execute(
-        select(models.ImprovementRequest)
-        .where(models.ImprovementRequest.user_id == user_id)
-        .order_by(models.ImprovementRequest.created_at.desc())
-        .limit(limit)
+        _STMT_USER_IMPROVEMENT_REQUESTS, {"user_id": user_id, "limit": limit}
     )
     return result.scalars().all()
 
@@ -257,42 +405,101 @@ async def get_improvement_request_by_id(
 ) -> Optional[models.ImprovementRequest]:
     """improvement_requests 단건 조회 (관리자 상세보기용)."""
     result = await db.execute(
-        select(models.ImprovementRequest)
-        .where(models.ImprovementRequest.id == request_id)
-        .limit(1)
+        _STMT_IMPROVEMENT_REQUEST_BY_ID, {"request_id": request_id}
     )
     return result.scalar_one_or_none()
 
 
-async def list_all_improvement_requests(
+# ngram 파서의 기본 토큰 길이(ngram_token_size). 이보다 짧은 검색어는 FULLTEXT 로 찾을 수 없다.
+_NGRAM_TOKEN_SIZE = 2
+
+# create_all 은 이미 있는 테이블에 인덱스를 추가하지 않는다. 인덱스 없이 MATCH 를 보내면
+# MySQL 이 1191 에러를 내므로, 앱 시작 시 실제로 인덱스가 있는지 확인된 경우에만 FULLTEXT 검색을 쓴다.
+_IMPROVEMENT_SEARCH_INDEX = "ix_improvement_requests_search"
+_improvement_fulltext_ready = False
+
+_STMT_SEARCH_INDEX_COLUMNS = text(
+    "SELECT COUNT(DISTINCT column_name) FROM information_schema.statistics "
+    "WHERE table_schema = DATABASE() AND table_name = :table_name "
+    "AND index_name = :index_name AND index_type = 'FULLTEXT'"
+)
+
+
+async def detect_improvement_search_index(db: AsyncSession) -> bool:
+    """FULLTEXT(ngram) 검색 인덱스가 있는지 확인하고 결과를 기억한다. (lifespan 에서 한 번 호출)"""
+    global _improvement_fulltext_ready
+    _improvement_fulltext_ready = False
+    if db.get_bind().dialect.name != "mysql":
+        return False
+    try:
+        result = await db.execute(
+            _STMT_SEARCH_INDEX_COLUMNS,
+            {"table_name": models.ImprovementRequest.__tablename__, "index_name": _IMPROVEMENT_SEARCH_INDEX},
+        )
+        _improvement_fulltext_ready = result.scalar_one() == 6
+    except Exception as e:
+        print(f"[WARN] 관리자 검색 인덱스 확인 실패, ilike 검색으로 진행: {e}")
+        return False
+
+    if not _improvement_fulltext_ready:
+        print(
+            f"[WARN] {_IMPROVEMENT_SEARCH_INDEX} (FULLTEXT/ngram) 인덱스가 없어 관리자 검색은 ilike 로 동작합니다. "
+            "models.ImprovementRequest 의 DDL 을 실행하세요."
+        )
+    return _improvement_fulltext_ready
+
+
+def _improvement_search_clause(db: AsyncSession, q: str):
+    """관리자 검색어 조건.
+
+    MySQL 에서 ix_improvement_requests_search (FULLTEXT/ngram) 가 확인되면 MATCH ... AGAINST 를 쓰고,
+    인덱스가 없거나 그 외 DB(SQLite 등), 너무 짧은 검색어는 기존 ilike 부분일치로 처리한다.
+    (ngram + InnoDB 기본 불용어 목록에서는 "a", "i" 가 들어간 2글자 토큰이 빠지므로,
+     영문 이메일/URL 검색 결과는 ilike 부분일치와 다를 수 있다)
+    """
+    ir = models.ImprovementRequest
+    columns = (
+        ir.company_name,
+        ir.contact_name,
+        ir.phone,
+        ir.email,
+        ir.core_keyword,
+        ir.blog_url,
+    )
+
+    if _improvement_fulltext_ready and len(q) >= _NGRAM_TOKEN_SIZE:
+        # 큰따옴표로 감싼 phrase 검색 → ngram 이 연속으로 나와야 매치 (부분일치와 유사)
+        phrase = '"' + q.replace('"', " ") + '"'
+        return match(*columns, against=phrase).in_boolean_mode()
+
+    like = f"%{q}%"
+    return or_(*(col.ilike(like) for col in columns))
+
+
+# 관리자 목록에서 쓰는 컬럼 (ImprovementRequestSummary 필드와 같은 이름)
+_IMPROVEMENT_SUMMARY_COLUMNS = tuple(
+    getattr(models.ImprovementRequest, name)
+    for name in schemas.ImprovementRequestSummary.model_fields
+)
+_IMPROVEMENT_SUMMARY_LIST = TypeAdapter(List[schemas.ImprovementRequestSummary])
+
+
+def _improvement_list_stmt(
     db: AsyncSession,
-    limit: int = 50,
-    offset: int = 0,
     q: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-) -> List[models.ImprovementRequest]:
-    """전체 improvement_requests 조회 (최신순).
+    columns: Optional[Sequence[Any]] = None,
+):
+    """관리자 목록/내보내기 공통 조회문 (검색어 + 날짜 범위 필터).
 
-    - q: 회사명/담당자/전화/이메일/키워드/URL 에 대해 부분일치 검색
-    - date_from/date_to: created_at 기준 범위 필터
-    - limit/offset: 페이지네이션
+    columns 를 주면 그 컬럼만 SELECT 한다. (없으면 ORM 엔티티 전체)
     """
-    stmt = select(models.ImprovementRequest)
+    stmt = select(*columns) if columns else select(models.ImprovementRequest)
 
     # 검색어 필터
-    if q:
-        like = f"%{q.strip()}%"
-        stmt = stmt.where(
-            or_(
-                models.ImprovementRequest.company_name.ilike(like),
-                models.ImprovementRequest.contact_name.ilike(like),
-                models.ImprovementRequest.phone.ilike(like),
-                models.ImprovementRequest.email.ilike(like),
-                models.ImprovementRequest.core_keyword.ilike(like),
-                models.ImprovementRequest.blog_url.ilike(like),
-            )
-        )
+    if q and q.strip():
+        stmt = stmt.where(_improvement_search_clause(db, q.strip()))
 
     # 날짜 범위 필터
     if date_from:
@@ -300,11 +507,73 @@ async def list_all_improvement_requests(
     if date_to:
         stmt = stmt.where(models.ImprovementRequest.created_at <= date_to)
 
-    stmt = (
-        stmt.order_by(models.ImprovementRequest.created_at.desc())
-        .offset(offset)
-        .limit(limit)
+    return stmt
+
+
+async def list_all_improvement_requests(
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    q: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Tuple[List[schemas.ImprovementRequestSummary], Optional[Tuple[datetime, int]]]:
+    """전체 improvement_requests 조회 (최신순).
+
+    - q: 회사명/담당자/전화/이메일/키워드/URL 에 대해 부분일치 검색
+    - date_from/date_to: created_at 기준 범위 필터
+    - limit/cursor: (created_at, id) keyset 페이지네이션 (cursor 보다 이전 행만 조회)
+      created_at 이 같은 행이 페이지 경계에 걸려도 id 로 구분되어 빠지거나 중복되지 않는다.
+    - 목록 화면용 요약 컬럼만 조회해서 ImprovementRequestSummary 로 반환한다.
+      analysis_md/analysis_json 은 읽지 않는다 (상세 조회는 get_improvement_request_by_id)
+
+    반환: (rows, next_cursor) — 다음 페이지가 없으면 next_cursor 는 None
+    """
+    stmt = _improvement_list_stmt(
+        db,
+        q=q,
+        date_from=date_from,
+        date_to=date_to,
+        columns=_IMPROVEMENT_SUMMARY_COLUMNS,
     )
 
+    # keyset 페이지네이션: OFFSET 처럼 앞 페이지 행을 읽고 버리지 않는다.
+    # (InnoDB 보조 인덱스에는 PK 가 붙어 있어서 ix_improvement_requests_created 가 (created_at, id) 순서를 커버)
+    if cursor:
+        stmt = stmt.where(
+            tuple_(models.ImprovementRequest.created_at, models.ImprovementRequest.id)
+            < tuple_(*cursor)
+        )
+
+    stmt = stmt.order_by(
+        models.ImprovementRequest.created_at.desc(),
+        models.ImprovementRequest.id.desc(),
+    ).limit(limit)
+
+    # ORM 엔티티를 만들지 않고 Row 를 요약 스키마로 한 번에 변환 (pydantic-core 일괄 검증)
     result = await db.execute(stmt)
-    return result.scalars().all()
\ No newline at end of file
+    rows = _IMPROVEMENT_SUMMARY_LIST.validate_python(result.all(), from_attributes=True)
+
+    next_cursor = (rows[-1].created_at, rows[-1].id) if len(rows) == limit else None
+    return rows, next_cursor
+
+
+async def stream_all_improvement_requests(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    chunk_size: int = 100,
+) -> AsyncIterator[models.ImprovementRequest]:
+    """전체 improvement_requests 를 최신순으로 스트리밍 조회 (관리자 내보내기용).
+
+    서버 사이드 커서 + yield_per 로 chunk_size 행씩 가져오므로
+    전체 결과를 한 번에 리스트로 만들지 않는다.
+    """
+    stmt = _improvement_list_stmt(
+        db, q=q, date_from=date_from, date_to=date_to
+    ).order_by(models.ImprovementRequest.created_at.desc())
+
+    result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+    async for row in result.scalars():
+        yield row
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # .env 로드
 load_dotenv()
@@ -18,13 +19,25 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env")
 
 # 비동기 엔진 생성
+# - 커넥션 풀을 유지해서 요청마다 TCP/TLS 핸드셰이크를 하지 않도록 한다.
+# - pool_pre_ping: 끊긴 커넥션을 요청 중에 만나지 않도록 체크아웃 시 확인
+# - pool_recycle: DB 쪽 idle timeout 보다 먼저 커넥션을 교체
+# - AsyncAdaptedQueuePool: asyncio 용 큐 풀 (동기 QueuePool 을 쓰면 동시 요청에서 멈출 수 있음)
+# - pool_size/max_overflow: 상시 20개 + 순간 10개까지, /mypage 처럼 요청당 여러 세션을 여는 경우를 감안
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # 디버깅 시 True로 바꾸면 SQL이 콘솔에 찍힘
     future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_recycle=1800,
+    pool_pre_ping=True,
+    pool_timeout=30,
 )
 
 # 세션 팩토리
+# - expire_on_commit=False: commit 후 속성 접근 시 다시 SELECT 하지 않도록
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
@@ -35,20 +48,17 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
-# FastAPI 의존성에서 사용할 DB 세션
+# FastAPI 의존성에서 사용할 DB 세션 (async with 가 요청 종료 시 세션을 닫는다)
 async def get_db():
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 # 테이블 생성용 유틸 (앱 시작 시 한 번 호출)
 async def init_db():
     """
     애플리케이션 시작 시 테이블을 생성하고 싶을 때 사용.
-    main.py에서 startup 이벤트에 연결해서 쓸 예정.
+    main.py 의 lifespan 에서 RUN_CREATE_ALL=1 일 때만 호출한다.
     """
     from . import models  # 모델을 임포트해서 Base.metadata에 등록
 
@@ -1,3 +1,4 @@
+import functools
 import os
 from typing import Annotated, Optional
 
@@ -5,7 +6,7 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import models, crud, schemas
+from . import crud, schemas
 from .auth import decode_access_token
 from .database import get_db
 
@@ -13,48 +14,65 @@ from .database import get_db
 # 나중에 main.py에서 /login POST로 토큰을 발급할 예정이므로 이렇게 맞춰둔다.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# 401 응답에 쓰는 값은 미리 만들어 두고, 예외 객체는 실패할 때만 만든다.
+# (예외 인스턴스 자체를 공유하면 동시 요청끼리 traceback/context 가 섞이므로 공유하지 않음)
+_BEARER_AUTH_HEADERS = {"WWW-Authenticate": "Bearer"}
+_BEARER_AUTH_DETAIL = "인증 정보가 유효하지 않습니다."
+_COOKIE_AUTH_DETAIL = "로그인이 필요합니다."
+
+
+def _bearer_credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=_BEARER_AUTH_DETAIL,
+        headers=_BEARER_AUTH_HEADERS,
+    )
+
 
 async def get_current_user(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
-) -> models.User:
+) -> crud.CachedUser:
     """
     Authorization 헤더의 Bearer 토큰을 읽어서
     디코딩한 뒤, 해당 유저를 DB에서 조회하여 반환.
 
     유효하지 않은 토큰이거나, 유저가 존재하지 않으면 401 에러.
+    같은 요청 안에서 이미 확인된 유저가 있으면(request.state.user) 그대로 재사용한다.
+    유저 조회는 crud.get_user_cached 의 워커별 캐시(TTL 30초)를 거치므로,
+    다른 워커에서 바뀐 유저 정보(비활성화 등)는 최대 30초 늦게 반영된다.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="인증 정보가 유효하지 않습니다.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    cached_user = getattr(request.state, "user", None)
+    if cached_user is not None:
+        return cached_user
 
     payload = decode_access_token(token)
     if payload is None:
         # 디코딩 실패, 서명 오류, 만료 등
-        raise credentials_exception
+        raise _bearer_credentials_exception()
 
     # 우리는 토큰 생성 시 {"sub": str(user.id)} 형태로 저장할 예정
     user_id_str: Optional[str] = payload.get("sub")  # type: ignore
     if user_id_str is None:
-        raise credentials_exception
+        raise _bearer_credentials_exception()
 
     try:
         user_id = int(user_id_str)
     except ValueError:
-        raise credentials_exception
+        raise _bearer_credentials_exception()
 
-    user = await crud.get_user(db, user_id=user_id)
+    user = await crud.get_user_cached(db, user_id=user_id)
     if user is None:
-        raise credentials_exception
+        raise _bearer_credentials_exception()
 
+    request.state.user = user
     return user
 
 
 async def get_current_active_user(
-    current_user: Annotated[models.User, Depends(get_current_user)],
-) -> models.User:
+    current_user: Annotated[crud.CachedUser, Depends(get_current_user)],
+) -> crud.CachedUser:
     """
     기본적으로 활성 유저만 허용하기 위한 의존성.
     current_user.is_active 가 False라면 400 에러.
@@ -70,51 +88,76 @@ async def get_current_active_user(
 # ======================
 # Web(템플릿)용: 쿠키 기반 인증
 # ======================
-async def get_current_user_from_cookie(
-    request: Request,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> models.User:
-    """브라우저 템플릿 라우트에서 쓰는 쿠키 기반 인증.
+def _user_id_from_cookie(request: Request) -> Optional[int]:
+    """쿠키의 JWT 에서 user_id(sub) 를 꺼낸다. 없거나 유효하지 않으면 None.
 
     - 쿠키 이름은 기본적으로 `access_token` 을 기대한다.
     - 값이 `Bearer <token>` 형태로 저장되어 있어도 처리한다.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="로그인이 필요합니다.",
-    )
-
     raw = request.cookies.get("access_token") or request.cookies.get("token")
     if not raw:
-        raise credentials_exception
+        return None
 
-    token = raw
-    if token.startswith("Bearer "):
-        token = token[len("Bearer ") :]
+    token = raw.removeprefix("Bearer ")
 
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
+        return None
 
     user_id_str: Optional[str] = payload.get("sub")  # type: ignore
     if not user_id_str:
-        raise credentials_exception
+        return None
 
     try:
-        user_id = int(user_id_str)
+        return int(user_id_str)
     except ValueError:
-        raise credentials_exception
+        return None
+
+
+async def get_current_user_from_cookie(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> crud.CachedUser:
+    """브라우저 템플릿 라우트에서 쓰는 쿠키 기반 인증.
 
-    user = await crud.get_user(db, user_id=user_id)
+    토큰이 없거나 유효하지 않으면 401 에러.
+    같은 요청 안에서 이미 확인된 유저가 있으면(request.state.user) 그대로 재사용한다.
+    """
+    user = await get_optional_user_from_cookie(request, db)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=_COOKIE_AUTH_DETAIL,
+        )
+    return user
+
+
+async def get_optional_user_from_cookie(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Optional[crud.CachedUser]:
+    """쿠키 기반 인증 (비로그인 허용).
+
+    로그인 상태면 유저를, 쿠키가 없거나 유효하지 않으면 None 을 반환.
+    (get_current_user 와 같은 워커별 유저 캐시를 쓰므로 최대 30초 이전 값일 수 있다)
+    """
+    cached_user = getattr(request.state, "user", None)
+    if cached_user is not None:
+        return cached_user
+
+    user_id = _user_id_from_cookie(request)
+    if user_id is None:
+        return None
 
+    user = await crud.get_user_cached(db, user_id=user_id)
+    if user is not None:
+        request.state.user = user
     return user
 
 
 async def get_current_active_user_from_cookie(
-    current_user: Annotated[models.User, Depends(get_current_user_from_cookie)],
-) -> models.User:
+    current_user: Annotated[crud.CachedUser, Depends(get_current_user_from_cookie)],
+) -> crud.CachedUser:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -126,17 +169,14 @@ async def get_current_active_user_from_cookie(
 # ======================
 # Admin 권한 체크
 # ======================
+@functools.lru_cache(maxsize=1)
 def _super_admin_email() -> str:
+    # 런타임에 바뀌지 않는 값이라 프로세스당 한 번만 읽는다.
     return (os.getenv("SUPER_ADMIN_EMAIL") or "").strip().lower()
 
 
-async def require_admin_user(
-    current_user: Annotated[models.User, Depends(get_current_active_user_from_cookie)],
-) -> models.User:
-    """최고관리자만 접근 허용.
-
-    SUPER_ADMIN_EMAIL 환경변수와 current_user.email 이 일치해야 통과.
-    """
+def _ensure_super_admin(current_user: crud.CachedUser) -> crud.CachedUser:
+    """current_user 가 SUPER_ADMIN_EMAIL 과 일치하지 않으면 에러."""
     admin_email = _super_admin_email()
     if not admin_email:
         raise HTTPException(
@@ -153,21 +193,18 @@ async def require_admin_user(
     return current_user
 
 
-# (선택) API(Bearer 토큰)용 관리자 체크가 필요할 때 사용
-async def require_admin_user_bearer(
-    current_user: Annotated[models.User, Depends(get_current_active_user)],
-) -> models.User:
-    admin_email = _super_admin_email()
-    if not admin_email:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="SUPER_ADMIN_EMAIL 이 설정되지 않았습니다.",
-        )
+async def require_admin_user(
+    current_user: Annotated[crud.CachedUser, Depends(get_current_active_user_from_cookie)],
+) -> crud.CachedUser:
+    """최고관리자만 접근 허용.
 
-    if (current_user.email or "").strip().lower() != admin_email:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="관리자만 접근할 수 있습니다.",
-        )
+    SUPER_ADMIN_EMAIL 환경변수와 current_user.email 이 일치해야 통과.
+    """
+    return _ensure_super_admin(current_user)
 
-    return current_user
\ No newline at end of file
+
+# (선택) API(Bearer 토큰)용 관리자 체크가 필요할 때 사용
+async def require_admin_user_bearer(
+    current_user: Annotated[crud.CachedUser, Depends(get_current_active_user)],
+) -> crud.CachedUser:
+    return _ensure_super_admin(current_user)
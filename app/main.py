@@ -1,5 +1,14 @@
 # app/main.py
-from typing import Optional
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from datetime import datetime
+import os
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from charset_normalizer import from_bytes
+import orjson
+from jinja2 import FileSystemBytecodeCache
 from pydantic import ValidationError
 
 from fastapi import (
@@ -11,141 +20,74 @@ from fastapi import (
     UploadFile,
     File,
 )
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import (
+    HTMLResponse,
+    RedirectResponse,
+    ORJSONResponse,
+    StreamingResponse,
+)
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, func
 
-from .database import init_db, get_db
-from . import schemas, crud, models
-from .auth import create_access_token, decode_access_token
-from .dependencies import get_current_active_user, require_admin_user
+from .database import init_db, get_db, engine, AsyncSessionLocal
+from . import schemas, crud
+from .auth import create_access_token, decode_access_token, invalidate_token
+from .dependencies import (
+    get_current_active_user,
+    get_current_user_from_cookie,
+    get_optional_user_from_cookie,
+    require_admin_user,
+)
 from . import services
 
 
 # ==========================
-# FastAPI 앱 생성 & 설정
-# ==========================
-app = FastAPI(title="AEO SEO Helper")
-
-# 정적 파일 (CSS, JS 등)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-
-# Jinja2 템플릿 설정
-templates = Jinja2Templates(directory="app/templates")
-
-
-# ==========================
-# 앱 시작 시 DB 테이블 생성
+# 앱 시작/종료 처리 (lifespan)
 # ==========================
-@app.on_event("startup")
-async def on_startup() -> None:
-    await init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 테이블 자동 생성은 RUN_CREATE_ALL=1 일 때만 (멀티 워커에서 워커마다 DDL 체크를 돌리지 않도록)
+    if os.getenv("RUN_CREATE_ALL") == "1":
+        await init_db()
+    # 관리자 검색용 FULLTEXT 인덱스가 실제로 있을 때만 MATCH 검색을 쓴다. (없으면 ilike)
+    async with AsyncSessionLocal() as session:
+        await crud.detect_improvement_search_index(session)
+    yield
+    await services.aclose_gemini_batcher()
+    await services.aclose_http_client()
+    await engine.dispose()
 
 
 # ==========================
-# 쿠키에서 현재 로그인 유저 가져오기 (웹용)
-# ==========================
-# ==========================
-# 쿠키에서 현재 로그인 유저 가져오기 (웹용)
-# ==========================
-async def get_current_user_from_cookie(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> models.User:
-    """
-    /login 에서 발급한 JWT를 access_token 쿠키에서 읽어와
-    현재 로그인한 유저를 반환한다.
-    토큰이 없거나 유효하지 않으면 401 에러 발생.
-    """
-    token_cookie = request.cookies.get("access_token")
-    if not token_cookie:
-        # 로그인 안 된 상태
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="로그인이 필요합니다.",
-        )
-
-    # 쿠키 값은 "Bearer <token>" 형태로 저장되어 있음
-    if token_cookie.startswith("Bearer "):
-        token = token_cookie[len("Bearer ") :]
-    else:
-        token = token_cookie
-
-    payload = decode_access_token(token)
-    if payload is None:
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="토큰이 유효하지 않습니다. 다시 로그인해 주세요.",
-        )
-
-    user_id_str = payload.get("sub")
-    if not user_id_str:
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="토큰에 사용자 정보가 없습니다.",
-        )
-
-    try:
-        user_id = int(user_id_str)
-    except ValueError:
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="토큰에 잘못된 사용자 정보가 포함되어 있습니다.",
-        )
-
-    user = await crud.get_user(db, user_id=user_id)
-    if not user:
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="사용자를 찾을 수 없습니다.",
-        )
-
-    return user
-
-# ==========================
-# 쿠키에서 현재 로그인 유저 가져오기 (옵션: 비로그인 허용)
+# FastAPI 앱 생성 & 설정
 # ==========================
-async def get_optional_user_from_cookie(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> Optional[models.User]:
-    """access_token 쿠키가 있으면 유저를 반환하고, 없거나 유효하지 않으면 None."""
-    token_cookie = request.cookies.get("access_token")
-    if not token_cookie:
-        return None
+# JSON 응답은 기본적으로 orjson 으로 직렬화
+app = FastAPI(
+    title="AEO SEO Helper",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
-    if token_cookie.startswith("Bearer "):
-        token = token_cookie[len("Bearer ") :]
-    else:
-        token = token_cookie
+# 응답 압축: 생성 원고/분석 결과 HTML·JSON 은 크고 압축이 잘 된다.
+# 1KB 미만(/me 등 작은 응답)은 그대로 보내고, 레벨 5 로 CPU 비용과 압축률을 절충
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-    payload = decode_access_token(token)
-    if payload is None:
-        return None
+# 정적 파일 (CSS, JS 등)
+app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-    user_id_str = payload.get("sub")
-    if not user_id_str:
-        return None
+# Jinja2 템플릿 설정
+templates = Jinja2Templates(directory="app/templates")
 
-    try:
-        user_id = int(user_id_str)
-    except ValueError:
-        return None
+# 운영(APP_ENV=prod)에서는 템플릿 파일 변경 감시(매 렌더마다 stat)를 끄고,
+# 컴파일된 바이트코드를 디스크에 캐시해서 워커 재시작 후 첫 렌더의 파싱/컴파일을 건너뛴다.
+if os.getenv("APP_ENV") == "prod":
+    _jinja_cache_dir = os.getenv("JINJA_BYTECODE_CACHE_DIR", "/tmp/jinja")
+    os.makedirs(_jinja_cache_dir, exist_ok=True)
+    templates.env.auto_reload = False
+    templates.env.bytecode_cache = FileSystemBytecodeCache(_jinja_cache_dir)
 
-    user = await crud.get_user(db, user_id=user_id)
-    return user
 
 # ==========================
 # 기본 라우트
@@ -299,7 +241,7 @@ async def login(
 # 로그인 확인용 샘플 엔드포인트
 # ==========================
 @app.get("/me", response_model=schemas.UserRead)
-async def read_me(current_user: models.User = Depends(get_current_active_user)):
+async def read_me(current_user: crud.CachedUser = Depends(get_current_active_user)):
     """
     현재 로그인한 유저 정보 확인용 (Swagger에서 토큰으로 테스트 가능)
     """
@@ -309,10 +251,20 @@ async def read_me(current_user: models.User = Depends(get_current_active_user)):
 # 로그아웃
 # ==========================
 @app.get("/logout")
-async def logout():
+async def logout(request: Request):
     """
     access_token 쿠키를 삭제하고 로그인 페이지로 리다이렉트
     """
+    # 캐시된 토큰 payload / 유저 정보를 같이 비운다.
+    token_cookie = request.cookies.get("access_token")
+    if token_cookie:
+        token = token_cookie.removeprefix("Bearer ")
+        payload = decode_access_token(token)
+        user_id_str = str(payload.get("sub") or "") if payload else ""
+        if user_id_str.isdigit():
+            crud.invalidate_user_cache(int(user_id_str))
+        invalidate_token(token)
+
     response = RedirectResponse(
         url="/login",
         status_code=status.HTTP_303_SEE_OTHER,
@@ -323,10 +275,60 @@ async def logout():
 # ==========================
 # 블로그 원고 자동 생성 (/generator)
 # ==========================
+# generator.html 폼 필드 (services.generate_blog_post 인자 이름과 같다)
+_GEN_FIELDS = (
+    "core_keyword",
+    "product_name",
+    "brand",
+    "target_audience",
+    "intent",
+    "persona",
+    "tone",
+    "must_keywords",
+    "must_headings",
+    "cta_text",
+    "banned_terms",
+    "additional_instructions",
+)
+
+
+def _generator_form(values: Optional[Mapping[str, Any]] = None) -> Dict[str, str]:
+    """generator.html 의 form 값. 각 필드를 한 번에 정리한다 (None → "", 앞뒤 공백 제거)."""
+    values = values or {}
+    return {k: (values.get(k) or "").strip() for k in _GEN_FIELDS}
+
+
+# 제품 상세 .txt 업로드 최대 크기 (메모리 보호용)
+MAX_PRODUCT_DETAIL_BYTES = 1 << 20  # 1 MiB
+
+
+def _decode_text_upload(raw: bytes) -> str:
+    """업로드된 텍스트 파일 디코딩: UTF-8 우선, 아니면 charset_normalizer 로 인코딩 판별."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # UTF-8 이 아니면 보통 첫 한글 바이트에서 바로 실패하므로 위 시도 비용은 작다.
+        # 한글 윈도우 메모장 등에서 저장된 파일을 위해 후보 인코딩을 좁혀서 판별한다.
+        best = from_bytes(raw, cp_isolation=["utf_8", "cp949", "euc_kr"]).best()
+        return raw.decode(best.encoding if best else "cp949", errors="ignore")
+
+
+async def _read_product_detail_file(upload: UploadFile) -> Optional[str]:
+    """업로드 파일을 읽어 텍스트로 반환. 최대 크기를 넘으면 None."""
+    if upload.size is not None and upload.size > MAX_PRODUCT_DETAIL_BYTES:
+        return None
+
+    # size 를 모르는 경우에도 한도 + 1 바이트까지만 읽어서 초과 여부를 판단
+    raw = await upload.read(MAX_PRODUCT_DETAIL_BYTES + 1)
+    if len(raw) > MAX_PRODUCT_DETAIL_BYTES:
+        return None
+    return _decode_text_upload(raw)
+
+
 @app.get("/generator", response_class=HTMLResponse)
 async def generator_form(
     request: Request,
-    current_user: models.User = Depends(get_current_user_from_cookie),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
 ):
     """
     블로그 원고 생성 폼 화면.
@@ -339,20 +341,7 @@ async def generator_form(
             "user": current_user,
             "error": None,
             "result": None,
-            "form": {
-                "core_keyword": "",
-                "product_name": "",
-                "brand": "",
-                "target_audience": "",
-                "intent": "",
-                "persona": "",
-                "tone": "",
-                "must_keywords": "",
-                "must_headings": "",
-                "cta_text": "",
-                "banned_terms": "",
-                "additional_instructions": "",
-            },
+            "form": _generator_form(),
         },
     )
 
@@ -374,14 +363,17 @@ async def generate_post(
     additional_instructions: Optional[str] = Form(None),
     product_detail_file: Optional[UploadFile] = File(None),
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_from_cookie),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
 ):
     """
     폼 데이터를 받아 Gemini API를 호출하고,
     생성된 원고를 DB에 저장한 뒤 화면에 표시.
     """
+    # 폼 값은 여기서 한 번만 정리하고, 화면 응답/Gemini 호출/DB 저장에 같은 dict 를 쓴다.
+    form = _generator_form(locals())
+
     # 필수 값 체크
-    if not core_keyword.strip():
+    if not form["core_keyword"]:
         return templates.TemplateResponse(
             "generator.html",
             {
@@ -389,20 +381,7 @@ async def generate_post(
                 "user": current_user,
                 "error": "핵심 키워드는 필수입니다.",
                 "result": None,
-                "form": {
-                    "core_keyword": core_keyword or "",
-                    "product_name": product_name or "",
-                    "brand": brand or "",
-                    "target_audience": target_audience or "",
-                    "intent": intent or "",
-                    "persona": persona or "",
-                    "tone": tone or "",
-                    "must_keywords": must_keywords or "",
-                    "must_headings": must_headings or "",
-                    "cta_text": cta_text or "",
-                    "banned_terms": banned_terms or "",
-                    "additional_instructions": additional_instructions or "",
-                },
+                "form": form,
             },
             status_code=status.HTTP_400_BAD_REQUEST,
         )
@@ -410,29 +389,29 @@ async def generate_post(
     # 제품 상세 .txt 파일 내용 읽기 (있으면)
     product_detail_text: Optional[str] = None
     if product_detail_file and product_detail_file.filename:
-        raw = await product_detail_file.read()
         try:
-            product_detail_text = raw.decode("utf-8")
-        except UnicodeDecodeError:
-            # 혹시 인코딩이 다른 경우를 대비해 대충이라도 읽기
-            product_detail_text = raw.decode("cp949", errors="ignore")
+            product_detail_text = await _read_product_detail_file(product_detail_file)
+        finally:
+            await product_detail_file.close()
+
+        if product_detail_text is None:
+            return templates.TemplateResponse(
+                "generator.html",
+                {
+                    "request": request,
+                    "user": current_user,
+                    "error": "제품 상세 파일은 1MB 이하만 업로드할 수 있습니다.",
+                    "result": None,
+                    "form": form,
+                },
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            )
 
     try:
         # Gemini로 블로그 원고 생성
-        content = services.generate_blog_post(
-            core_keyword=core_keyword,
-            product_name=product_name,
-            brand=brand,
-            target_audience=target_audience,
-            intent=intent,
-            persona=persona,
-            tone=tone,
-            must_keywords=must_keywords,
-            must_headings=must_headings,
-            cta_text=cta_text,
-            banned_terms=banned_terms,
+        content = await services.generate_blog_post(
+            **form,
             product_detail_text=product_detail_text,
-            additional_instructions=additional_instructions,
         )
     except Exception as e:
         # Gemini 호출 실패 시 에러 메시지 표시
@@ -443,20 +422,7 @@ async def generate_post(
                 "user": current_user,
                 "error": f"원고 생성 중 오류가 발생했습니다: {e}",
                 "result": None,
-                "form": {
-                    "core_keyword": core_keyword or "",
-                    "product_name": product_name or "",
-                    "brand": brand or "",
-                    "target_audience": target_audience or "",
-                    "intent": intent or "",
-                    "persona": persona or "",
-                    "tone": tone or "",
-                    "must_keywords": must_keywords or "",
-                    "must_headings": must_headings or "",
-                    "cta_text": cta_text or "",
-                    "banned_terms": banned_terms or "",
-                    "additional_instructions": additional_instructions or "",
-                },
+                "form": form,
             },
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
@@ -464,10 +430,10 @@ async def generate_post(
     # DB에 저장할 Article 데이터 준비 (기본 필드만 우선 저장)
     article_in = schemas.ArticleCreate(
         title=None,  # 나중에 제목 추출 로직을 붙여도 됨
-        core_keyword=core_keyword,
-        product_name=product_name,
-        target_audience=target_audience,
-        tone=tone,
+        core_keyword=form["core_keyword"],
+        product_name=form["product_name"] or None,
+        target_audience=form["target_audience"] or None,
+        tone=form["tone"] or None,
         content=content,
     )
 
@@ -492,29 +458,104 @@ async def generate_post(
                 "target_audience": article.target_audience,
                 "tone": article.tone,
             },
-            "form": {
-                "core_keyword": core_keyword or "",
-                "product_name": product_name or "",
-                "brand": brand or "",
-                "target_audience": target_audience or "",
-                "intent": intent or "",
-                "persona": persona or "",
-                "tone": tone or "",
-                "must_keywords": must_keywords or "",
-                "must_headings": must_headings or "",
-                "cta_text": cta_text or "",
-                "banned_terms": banned_terms or "",
-                "additional_instructions": additional_instructions or "",
-            },
+            "form": form,
         },
     )
 
 
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    head = f"event: {event}\n".encode() if event else b""
+    return head + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/generator/stream")
+async def generate_post_stream(
+    core_keyword: str = Form(...),
+    product_name: Optional[str] = Form(None),
+    brand: Optional[str] = Form(None),
+    target_audience: Optional[str] = Form(None),
+    intent: Optional[str] = Form(None),
+    persona: Optional[str] = Form(None),
+    tone: Optional[str] = Form(None),
+    must_keywords: Optional[str] = Form(None),
+    must_headings: Optional[str] = Form(None),
+    cta_text: Optional[str] = Form(None),
+    banned_terms: Optional[str] = Form(None),
+    additional_instructions: Optional[str] = Form(None),
+    product_detail_file: Optional[UploadFile] = File(None),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
+):
+    """
+    /generator 와 같은 폼을 받아, 생성되는 원고를 Server-Sent Events 로 바로 흘려보낸다.
+    - 조각마다: data: {"text": "..."}
+    - 끝나면 DB에 저장하고: event: done / data: {"article_id": ...}
+    - 실패하면: event: error / data: {"error": "..."}
+    응답이 끝날 때까지 세션이 열려 있어야 해서 get_db 대신 별도 세션을 연다.
+    (text/event-stream 은 GZipMiddleware 가 압축하지 않으므로 조각이 버퍼링되지 않는다)
+    """
+    form = _generator_form(locals())
+    if not form["core_keyword"]:
+        return ORJSONResponse(
+            {"error": "핵심 키워드는 필수입니다."},
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    product_detail_text: Optional[str] = None
+    if product_detail_file and product_detail_file.filename:
+        try:
+            product_detail_text = await _read_product_detail_file(product_detail_file)
+        finally:
+            await product_detail_file.close()
+
+        if product_detail_text is None:
+            return ORJSONResponse(
+                {"error": "제품 상세 파일은 1MB 이하만 업로드할 수 있습니다."},
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            )
+
+    user_id = current_user.id
+
+    async def _events():
+        # 헤더는 이미 나갔으므로, 생성/저장 어느 단계에서 실패해도 error 이벤트로 끝낸다.
+        parts = []
+        try:
+            async for chunk in services.generate_blog_post_stream(
+                **form,
+                product_detail_text=product_detail_text,
+            ):
+                parts.append(chunk)
+                yield _sse_event({"text": chunk})
+        except Exception as e:
+            yield _sse_event({"error": f"원고 생성 중 오류가 발생했습니다: {e}"}, event="error")
+            return
+
+        try:
+            article_in = schemas.ArticleCreate(
+                title=None,
+                core_keyword=form["core_keyword"],
+                product_name=form["product_name"] or None,
+                target_audience=form["target_audience"] or None,
+                tone=form["tone"] or None,
+                content=services.finalize_blog_post("".join(parts)),
+            )
+            async with AsyncSessionLocal() as session:
+                article = await crud.create_article(session, user_id=user_id, article_in=article_in)
+        except Exception as e:
+            yield _sse_event({"error": f"원고 저장 중 오류가 발생했습니다: {e}"}, event="error")
+            return
+        yield _sse_event({"article_id": article.id}, event="done")
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
 
 @app.get("/improvement", response_class=HTMLResponse)
 async def improvement_page(
     request: Request,
-    current_user: Optional[models.User] = Depends(get_optional_user_from_cookie),
+    current_user: Optional[crud.CachedUser] = Depends(get_optional_user_from_cookie),
 ):
     return templates.TemplateResponse(
         "improvement.html",
@@ -535,16 +576,16 @@ async def improvement_action(
     phone: Optional[str] = Form(None),
     email: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_optional_user_from_cookie),
+    current_user: Optional[crud.CachedUser] = Depends(get_optional_user_from_cookie),
 ):
     try:
         # 1) URL에서 본문 크롤링
-        content = services.scrape_url_content(blog_url)
+        content = await services.scrape_url_content(blog_url)
 
         # 2) Gemini로 분석/개선안 생성
         #    - 신규: JSON 스키마 분석 (서비스 UI용)
         #    - 폴백: 기존 마크다운/텍스트 그대로 보여주기
-        analysis_json, raw_text = services.analyze_blog_post_json(
+        analysis_json, raw_text = await services.analyze_blog_post_json(
             blog_text=content,
             core_keyword=core_keyword,
             blog_url=blog_url,
@@ -574,9 +615,13 @@ async def improvement_action(
                 req_in = schemas.ImprovementRequestCreate(**payload)
             except ValidationError as ve:
                 # JSON 분석 결과가 스키마에 맞지 않아도, 분석 텍스트는 저장/반환할 수 있게 폴백
+                # 오류가 analysis_json 에만 있으면 나머지 필드는 이미 검증된 것이므로
+                # 다시 전체 검증하지 않고 model_construct 로 만든다.
+                if any(err["loc"][:1] != ("analysis_json",) for err in ve.errors()):
+                    raise
                 payload["analysis_json"] = None
                 payload["analysis_version"] = None
-                req_in = schemas.ImprovementRequestCreate(**payload)
+                req_in = schemas.ImprovementRequestCreate.model_construct(**payload)
 
             saved = await crud.create_improvement_request(
                 db,
@@ -588,7 +633,7 @@ async def improvement_action(
             # 저장 실패해도 분석 결과는 반환
             saved_id = None
 
-        return JSONResponse(
+        return ORJSONResponse(
             {
                 "success": True,
                 # 서비스 UI에서 우선 사용할 구조화 결과
@@ -599,7 +644,7 @@ async def improvement_action(
             }
         )
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             {
                 "success": False,
                 "error": str(e),
@@ -614,7 +659,7 @@ async def improvement_action(
 async def monitoring_page(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_from_cookie),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
 ):
     """순위 모니터링 폼 + 최근 기록 리스트 화면"""
     logs = await crud.list_user_monitored_keywords(
@@ -645,18 +690,21 @@ async def monitoring_action(
     keyword: str = Form(...),
     blog_url: str = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_from_cookie),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
 ):
     """키워드 + 블로그 URL로 네이버 검색 순위를 체크하고 결과를 저장"""
     error: Optional[str] = None
     result_data = None
 
-    if not keyword.strip() or not blog_url.strip():
+    keyword = keyword.strip()
+    blog_url = blog_url.strip()
+
+    if not keyword or not blog_url:
         error = "키워드와 블로그 URL을 모두 입력해 주세요."
     else:
         try:
             # 1) 네이버 검색 API를 통해 현재 순위 확인
-            rank_info = services.check_naver_rank(
+            rank_info = await services.check_naver_rank(
                 keyword=keyword,
                 blog_url=blog_url,
             )
@@ -702,8 +750,8 @@ async def monitoring_action(
             "result": result_data,
             "error": error,
             "form": {
-                "keyword": keyword or "",
-                "blog_url": blog_url or "",
+                "keyword": keyword,
+                "blog_url": blog_url,
             },
         },
     )
@@ -714,31 +762,26 @@ async def monitoring_action(
 @app.get("/mypage", response_class=HTMLResponse)
 async def mypage(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_from_cookie),
+    current_user: crud.CachedUser = Depends(get_current_user_from_cookie),
 ):
     """
     내가 생성한 블로그 원고 + 키워드 모니터링 기록을 한 화면에서 보는 페이지
     """
-    # 내가 만든 원고들
-    articles = await crud.list_user_articles(
-        db,
-        user_id=current_user.id,
-        limit=50,
-    )
-
-    # 내가 체크한 순위 모니터링 로그
-    logs = await crud.list_user_monitored_keywords(
-        db,
-        user_id=current_user.id,
-        limit=50,
-    )
 
-    # 내가 요청한 블로그 개선(분석) 기록
-    improvement_requests = await crud.list_user_improvement_requests(
-        db,
-        user_id=current_user.id,
-        limit=50,
+    # 세 목록은 서로 독립적인 SELECT 이므로 동시에 실행한다.
+    # AsyncSession 은 동시 await 에 공유할 수 없어서 조회마다 짧은 세션을 따로 연다.
+    async def _list(fn):
+        async with AsyncSessionLocal() as session:
+            return await fn(session, user_id=current_user.id, limit=50)
+
+    (
+        articles,              # 내가 만든 원고들
+        logs,                  # 내가 체크한 순위 모니터링 로그
+        improvement_requests,  # 내가 요청한 블로그 개선(분석) 기록
+    ) = await asyncio.gather(
+        _list(crud.list_user_articles),
+        _list(crud.list_user_monitored_keywords),
+        _list(crud.list_user_improvement_requests),
     )
 
     return templates.TemplateResponse(
@@ -756,25 +799,47 @@ async def mypage(
 # ==========================
 # Admin: Improvement 요청 전체 조회/상세
 # ==========================
+def _encode_list_cursor(cursor: Optional[Tuple[datetime, int]]) -> str:
+    """(created_at, id) keyset 커서를 URL 용 문자열로 ("{iso}:{id}" 의 base64)."""
+    if not cursor:
+        return ""
+    created_at, item_id = cursor
+    raw = f"{created_at.isoformat()}:{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_list_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """_encode_list_cursor 의 역변환. 형식이 잘못되면 None (첫 페이지)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        iso, _, item_id = raw.rpartition(":")
+        return datetime.fromisoformat(iso), int(item_id)
+    except ValueError:
+        return None
+
+
 @app.get("/admin/improvements", response_class=HTMLResponse)
 async def admin_improvements_list(
     request: Request,
     q: Optional[str] = None,
-    page: int = 1,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    admin_user: models.User = Depends(require_admin_user),
+    admin_user: crud.CachedUser = Depends(require_admin_user),
 ):
-    """최고관리자 전용: improvement_requests 전체 목록."""
-    if page < 1:
-        page = 1
+    """최고관리자 전용: improvement_requests 전체 목록.
 
+    cursor: 이전 페이지 마지막 항목의 (created_at, id) 를 인코딩한 값. 없으면 첫 페이지.
+    """
     limit = 50
-    offset = (page - 1) * limit
 
-    items = await crud.list_all_improvement_requests(
+    cursor_key = _decode_list_cursor(cursor)
+
+    items, next_cursor = await crud.list_all_improvement_requests(
         db,
         limit=limit,
-        offset=offset,
+        cursor=cursor_key,
         q=q,
     )
 
@@ -785,18 +850,53 @@ async def admin_improvements_list(
             "user": admin_user,
             "items": items,
             "q": q or "",
-            "page": page,
+            "cursor": _encode_list_cursor(cursor_key),
+            "cursor_label": cursor_key[0].isoformat() if cursor_key else "",
+            "next_cursor": _encode_list_cursor(next_cursor),
             "limit": limit,
         },
     )
 
 
+@app.get("/admin/improvements/export")
+async def admin_improvements_export(
+    q: Optional[str] = None,
+    admin_user: crud.CachedUser = Depends(require_admin_user),
+):
+    """최고관리자 전용: improvement_requests 전체를 NDJSON 으로 내보내기.
+
+    행을 yield_per 단위로 읽으면서 바로 내려보내므로 건수가 많아도 메모리가 일정하다.
+    응답이 끝날 때까지 세션이 열려 있어야 해서 get_db 대신 별도 세션을 연다.
+    """
+
+    async def _rows():
+        async with AsyncSessionLocal() as session:
+            async for item in crud.stream_all_improvement_requests(session, q=q):
+                line = {
+                    "id": item.id,
+                    "user_id": item.user_id,
+                    "company_name": item.company_name,
+                    "contact_name": item.contact_name,
+                    "phone": item.phone,
+                    "email": item.email,
+                    "blog_url": item.blog_url,
+                    "core_keyword": item.core_keyword,
+                    "analysis_md": item.analysis_md,
+                    "analysis_json": item.analysis_json,
+                    "analysis_version": item.analysis_version,
+                    "created_at": item.created_at.isoformat() if item.created_at else None,
+                }
+                yield orjson.dumps(line) + b"\n"
+
+    return StreamingResponse(_rows(), media_type="application/x-ndjson")
+
+
 @app.get("/admin/improvements/{request_id}", response_class=HTMLResponse)
 async def admin_improvements_detail(
     request: Request,
     request_id: int,
     db: AsyncSession = Depends(get_db),
-    admin_user: models.User = Depends(require_admin_user),
+    admin_user: crud.CachedUser = Depends(require_admin_user),
 ):
     """최고관리자 전용: improvement_requests 상세."""
     item = await crud.get_improvement_request_by_id(db, request_id=request_id)
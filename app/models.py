@@ -6,6 +6,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     BigInteger,
     String,
@@ -51,13 +52,17 @@ class Article(Base):
     """
 
     __tablename__ = "articles"
+    # user_id 단독 인덱스는 두지 않는다: (user_id, ...) 복합 인덱스가 FK/단건 조회도 커버한다.
+    __table_args__ = (
+        # list_user_articles: WHERE user_id=? ORDER BY created_at DESC
+        Index("ix_articles_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     # 사용자가 입력한 조건들
@@ -82,13 +87,16 @@ class MonitoredKeyword(Base):
     """
 
     __tablename__ = "monitored_keywords"
+    __table_args__ = (
+        # list_user_monitored_keywords: WHERE user_id=? ORDER BY last_checked_at DESC
+        Index("ix_monitored_keywords_user_checked", "user_id", "last_checked_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     keyword = Column(String(255), nullable=False)           # 검색어
@@ -112,6 +120,28 @@ class ImprovementRequest(Base):
     """
 
     __tablename__ = "improvement_requests"
+    __table_args__ = (
+        # list_user_improvement_requests: WHERE user_id=? ORDER BY created_at DESC
+        Index("ix_improvement_requests_user_created", "user_id", "created_at"),
+        # list_all_improvement_requests: ORDER BY created_at DESC (keyset)
+        Index("ix_improvement_requests_created", "created_at"),
+        # 관리자 검색(q): MySQL FULLTEXT + ngram 파서 (한글 부분일치 대응)
+        # create_all 은 기존 테이블에 인덱스를 추가하지 않으므로, 운영 DB 에는 직접 실행한다:
+        #   CREATE FULLTEXT INDEX ix_improvement_requests_search ON improvement_requests
+        #     (company_name, contact_name, phone, email, core_keyword, blog_url) WITH PARSER ngram;
+        # 인덱스가 없으면 앱 시작 시 감지해서 ilike 검색으로 동작한다. (crud.detect_improvement_search_index)
+        Index(
+            "ix_improvement_requests_search",
+            "company_name",
+            "contact_name",
+            "phone",
+            "email",
+            "core_keyword",
+            "blog_url",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
 
@@ -119,7 +149,6 @@ class ImprovementRequest(Base):
         Integer,
         ForeignKey("users.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
 
     company_name = Column(String(255), nullable=True)
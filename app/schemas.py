@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional, List, Any
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 # ======================
@@ -28,8 +28,7 @@ class UserRead(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ======================
@@ -65,8 +64,7 @@ class ArticleRead(ArticleBase):
     user_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ======================
@@ -92,8 +90,7 @@ class MonitoredKeywordRead(MonitoredKeywordBase):
     last_checked_at: datetime
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ======================
@@ -151,9 +148,7 @@ class ImprovementAnalysis(BaseModel):
     raw_text: Optional[str] = None
 
     # 파서가 모르는 키가 와도 통과시키기(서비스 안정성)
-    model_config = {
-        "extra": "allow",
-    }
+    model_config = ConfigDict(extra="allow")
 
 
 # ======================
@@ -180,8 +175,22 @@ class ImprovementRequestRead(ImprovementRequestBase):
     user_id: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImprovementRequestSummary(BaseModel):
+    """관리자 목록용 요약 (분석 본문 없음, 중첩 검증 없음)."""
+
+    id: int
+    company_name: Optional[str] = None
+    contact_name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None  # 목록 표시용이라 EmailStr 검증은 생략
+    blog_url: str
+    core_keyword: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ======================
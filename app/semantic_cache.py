@@ -0,0 +1,81 @@
+# app/semantic_cache.py
+import math
+import time
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+
+
+# ==========================
+# 의미 유사도 기반 응답 캐시 (임베딩 코사인 유사도)
+# ==========================
+class SemanticCache:
+    """
+    내용이 "거의 같은" 입력에 대해 이전 응답을 재사용하기 위한 프로세스 로컬 캐시.
+
+    - namespace 가 같은 항목끼리만 비교한다. (예: (blog_url, core_keyword))
+    - lookup() 은 가장 가까운 항목과 유사도를 돌려주고, 재사용 여부는 호출하는 쪽에서
+      hit_threshold / verify_threshold 로 판단한다.
+      · similarity >= hit_threshold              → 바로 재사용
+      · verify_threshold <= similarity < hit     → 별도 검증(예: 짧은 LLM 확인) 후 재사용
+      · 그 아래                                   → miss
+    - 임베딩이 원문 일부만 보는 경우를 위해 항목마다 전체 원문의 digest 를 함께 저장/반환한다.
+    - 벡터는 저장할 때 정규화해 두므로 유사도 계산은 내적 한 번이다. (numpy 없이 순수 파이썬)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl_s: float = 86400,
+        hit_threshold: float = 0.97,
+        verify_threshold: float = 0.85,
+    ) -> None:
+        self.hit_threshold = hit_threshold
+        self.verify_threshold = verify_threshold
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        # (저장 시각, namespace, 정규화된 벡터, 원문 일부, 전체 원문 digest, 값) — 오래된 것이 앞쪽
+        self._entries: List[Tuple[float, Hashable, Tuple[float, ...], str, str, Any]] = []
+
+    def lookup(
+        self, namespace: Hashable, embedding: Sequence[float]
+    ) -> Optional[Tuple[float, str, str, Any]]:
+        """가장 유사한 항목의 (유사도, 저장 당시 원문, 전체 원문 digest, 값). verify_threshold 미만이거나 없으면 None."""
+        self._expire()
+        query = _normalize(embedding)
+        best: Optional[Tuple[float, str, str, Any]] = None
+        for _, ns, vec, source_text, digest, value in self._entries:
+            if ns != namespace or len(vec) != len(query):
+                continue
+            similarity = sum(a * b for a, b in zip(vec, query))
+            if best is None or similarity > best[0]:
+                best = (similarity, source_text, digest, value)
+
+        if best is None or best[0] < self.verify_threshold:
+            return None
+        return best
+
+    def add(
+        self,
+        namespace: Hashable,
+        embedding: Sequence[float],
+        source_text: str,
+        digest: str,
+        value: Any,
+    ) -> None:
+        self._expire()
+        self._entries.append((time.monotonic(), namespace, _normalize(embedding), source_text, digest, value))
+        if len(self._entries) > self._max_entries:
+            del self._entries[: len(self._entries) - self._max_entries]
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self._ttl_s
+        drop = 0
+        while drop < len(self._entries) and self._entries[drop][0] < cutoff:
+            drop += 1
+        if drop:
+            del self._entries[:drop]
+
+
+def _normalize(vec: Sequence[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return tuple(x / norm for x in vec)
@@ -1,14 +1,30 @@
 # app/services.py
-from typing import Optional, Any, List, Dict, Tuple
+from typing import Optional, Any, AsyncContextManager, AsyncIterator, Callable, List, Dict, NamedTuple, Tuple, Union
+import asyncio
+from contextlib import asynccontextmanager
 import os
 import json
+import hashlib
+import html as html_lib
 import re
+import time
+from functools import lru_cache
+from datetime import timedelta
+from pathlib import Path
+from string import Template
 from urllib.parse import urlparse, parse_qs
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer
+from cachetools import TTLCache
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.generativeai import caching
+
+from .batching import MicroBatcher
+from .semantic_cache import SemanticCache
 
 # ==========================
 # 환경변수 로드
@@ -25,6 +41,9 @@ genai.configure(api_key=GEMINI_API_KEY)
 # 너 계정에서 list_models()로 확인한 유효 모델
 GEMINI_MODEL_NAME = "models/gemini-pro-latest"
 
+# 모델 객체는 프로세스에서 하나만 만들어 재사용한다. (호출마다 생성하지 않도록)
+_MODEL = genai.GenerativeModel(GEMINI_MODEL_NAME)
+
 # ---- Naver 검색 API 설정 ----
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
@@ -36,6 +55,178 @@ if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
         "순위 모니터링 기능 사용 시 오류가 날 수 있습니다."
     )
 
+# ---- 외부 HTTP 클라이언트 ----
+# 크롤링/네이버 API 호출이 이벤트 루프를 막지 않도록 AsyncClient 하나를 모듈 단위로 공유한다.
+# (커넥션 풀 재사용, 종료 시 lifespan 에서 aclose_http_client() 로 닫는다)
+_http = httpx.AsyncClient(
+    timeout=10,
+    http2=True,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=20),
+)
+
+
+# 네이버 검색 API 전용 클라이언트: 인증 헤더를 import 시점에 한 번만 만들어 두고,
+# openapi.naver.com 한 곳으로 keep-alive(HTTP/2) 커넥션을 재사용한다.
+_NAVER_HEADERS: Dict[str, str] = (
+    {
+        "X-Naver-Client-Id": NAVER_CLIENT_ID,
+        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
+    }
+    if NAVER_CLIENT_ID and NAVER_CLIENT_SECRET
+    else {}
+)
+_NAVER_SEARCH_PATHS = {
+    "web": "/v1/search/webkr.json",
+    "blog": "/v1/search/blog.json",
+}
+_naver_http = httpx.AsyncClient(
+    base_url="https://openapi.naver.com",
+    headers=_NAVER_HEADERS,
+    http2=True,
+    timeout=5,
+)
+
+
+# 일시적인 실패(429/5xx, 연결 끊김)는 짧게 지수 백오프하며 재시도한다. (0.3s, 0.6s, 1.2s ...)
+HTTP_RETRY_TOTAL = int(os.getenv("HTTP_RETRY_TOTAL", "3"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+async def _get_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    stream: bool = False,
+    limiter: Optional[Callable[[], AsyncContextManager[None]]] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    client.get() 을 재시도와 함께 호출한다. 마지막 시도의 응답(또는 예외)을 그대로 돌려준다.
+    stream=True 이면 본문을 읽지 않은 응답을 돌려주므로, 호출한 쪽에서 aclose() 해야 한다.
+    limiter 가 있으면 시도마다 그 안에서 요청을 보낸다. (재시도 대기 중에는 잡고 있지 않음)
+    """
+    for attempt in range(HTTP_RETRY_TOTAL + 1):
+        last = attempt == HTTP_RETRY_TOTAL
+        try:
+            if limiter is None:
+                resp = await client.send(client.build_request("GET", url, **kwargs), stream=stream)
+            else:
+                async with limiter():
+                    resp = await client.send(client.build_request("GET", url, **kwargs), stream=stream)
+        except httpx.TransportError:
+            if last:
+                raise
+        else:
+            if last or resp.status_code not in _RETRY_STATUSES:
+                return resp
+            if stream:
+                await resp.aclose()
+        await asyncio.sleep(HTTP_RETRY_BACKOFF * (2 ** attempt))
+    raise AssertionError("unreachable")
+
+
+async def aclose_http_client() -> None:
+    """공유 HTTP 클라이언트 종료 (앱 shutdown 시 호출)."""
+    await _http.aclose()
+    await _naver_http.aclose()
+
+
+# ---- 크롤링 결과 캐시 ----
+# 같은 URL을 짧은 시간 안에 다시 분석하면 fetch+parse 를 건너뛴다. (프로세스 로컬, 기본 10분)
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", "600"))
+_scrape_cache: TTLCache = TTLCache(maxsize=512, ttl=SCRAPE_CACHE_TTL)
+
+# 분석 프롬프트에 들어가는 블로그 본문의 최대 토큰 수(로컬 추정치 기준)
+GEMINI_MAX_INPUT_TOKENS = int(os.getenv("GEMINI_MAX_INPUT_TOKENS", "6000"))
+
+# 한 번의 Gemini 호출에 보내는 전체 프롬프트(고정 지침 + 가변 부분)의 최대 토큰 수(로컬 추정치 기준)
+# 넘으면 API 왕복 뒤에야 실패하므로, 보내기 전에 덜 중요한 입력부터 줄인다.
+GEMINI_MAX_PROMPT_TOKENS = int(os.getenv("GEMINI_MAX_PROMPT_TOKENS", "30000"))
+
+
+# ---- Gemini 응답 캐시 ----
+# 같은 입력으로 다시 요청하면(재시도, 새로고침 등) Gemini 를 다시 부르지 않고 저장된 결과를 돌려준다.
+# - 분석(JSON/마크다운): 같은 URL + 키워드 + 본문이면 재사용
+# - 원고 생성: 샘플링 결과가 매번 달라지므로(같은 입력으로 다시 뽑고 싶은 경우가 있음)
+#   GEMINI_CACHE_GENERATED_POSTS=1 일 때만 캐시한다.
+GEMINI_RESPONSE_CACHE_TTL = int(os.getenv("GEMINI_RESPONSE_CACHE_TTL", "3600"))
+GEMINI_CACHE_GENERATED_POSTS = os.getenv("GEMINI_CACHE_GENERATED_POSTS") == "1"
+_response_cache: TTLCache = TTLCache(maxsize=512, ttl=GEMINI_RESPONSE_CACHE_TTL)
+
+
+def _response_cache_key(kind: str, *parts: str) -> str:
+    h = hashlib.blake2b(kind.encode("utf-8"), digest_size=16)
+    for part in parts:
+        h.update(b"\x00")
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---- 의미 유사도 캐시 (마크다운 분석) ----
+# 같은 글을 조금 고쳐서 다시 분석하는 경우, 본문 임베딩이 충분히 비슷하면 이전 분석을 재사용한다.
+# - 유사도 >= SEMANTIC_CACHE_HIT: 바로 재사용
+# - SEMANTIC_CACHE_VERIFY <= 유사도 < HIT: 짧은 YES/NO 확인 호출로 검증 후 재사용
+# 임베딩 호출이 추가되므로 SEMANTIC_CACHE=1 일 때만 켠다.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE") == "1"
+GEMINI_EMBED_MODEL_NAME = os.getenv("GEMINI_EMBED_MODEL_NAME", "models/text-embedding-004")
+SEMANTIC_CACHE_SOURCE_CHARS = 2000
+_semantic_cache = SemanticCache(
+    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256")),
+    ttl_s=int(os.getenv("SEMANTIC_CACHE_TTL", "86400")),
+    hit_threshold=float(os.getenv("SEMANTIC_CACHE_HIT", "0.97")),
+    verify_threshold=float(os.getenv("SEMANTIC_CACHE_VERIFY", "0.85")),
+)
+
+
+# ==========================
+# 프롬프트 템플릿 (app/prompts/*.tmpl)
+# ==========================
+# 프롬프트 문구는 코드와 분리해서 파일로 관리하고, 모듈 로드 시 한 번만 읽어서 string.Template 으로 둔다.
+# (치환 자리표시자는 ${name}, 문자 그대로의 $ 는 $$)
+_PROMPT_DIR = Path(__file__).resolve().parent / "prompts"
+
+
+def _load_prompt(name: str) -> Template:
+    return Template((_PROMPT_DIR / name).read_text(encoding="utf-8"))
+
+
+# 기본 금지어 (원고 생성 고정 지침에 포함)
+# 요청마다 사용자 금지어와 차집합을 구하므로 frozenset 으로 한 번만 만든다.
+# 프롬프트에 넣을 때는 정렬해서 넣어야 프로세스마다 같은 문자열이 된다. (hash seed 와 무관)
+_DEFAULT_BANNED = frozenset({
+    "효과",
+    "효능",
+    "개선",
+    "주름개선",
+    "탄력개선",
+    "리프팅",
+    "안티에이징",
+    "치료",
+    "치유",
+    "회복",
+    "통증 완화",
+    "스트레스 완화",
+    "임상",
+    "임상으로 입증",
+})
+
+# 원고 생성: 고정 지침(요청과 무관, import 시 한 번 완성) + 요청별 입력값
+_BLOG_POST_SYSTEM = _load_prompt("blog_post_system.tmpl").substitute(
+    default_banned_terms=", ".join(sorted(_DEFAULT_BANNED)),
+)
+_BLOG_POST_USER_PROMPT = _load_prompt("blog_post_user.tmpl")
+
+# JSON 분석: 역할/[기준]/스키마/[출력 형식] 고정 지침 + 분석 대상/본문
+_ANALYZE_JSON_SYSTEM = _load_prompt("analyze_json_system.tmpl").substitute()
+_ANALYZE_JSON_USER_PROMPT = _load_prompt("analyze_json_user.tmpl")
+
+# 마크다운 분석: [기준]/[요구 사항]/[출력 형식] 고정 지침 + 분석 대상/본문
+_ANALYZE_MD_SYSTEM = _load_prompt("analyze_md_system.tmpl").substitute()
+_ANALYZE_MD_USER_PROMPT = _load_prompt("analyze_md_user.tmpl")
+_SEMANTIC_VERIFY_PROMPT = _load_prompt("semantic_verify.tmpl")
+
 
 # ==========================
 # 공통 유틸
@@ -46,6 +237,39 @@ def _split_csv(text: Optional[str]) -> List[str]:
     return [x.strip() for x in text.split(",") if x.strip()]
 
 
+def _estimate_tokens(text: str) -> int:
+    """
+    Gemini 토큰 수를 로컬에서 대략 추정한다. (count_tokens API 호출 없이)
+    - 한글 등 비ASCII: 약 2글자당 1토큰, ASCII: 약 4글자당 1토큰 (넉넉하게 잡은 값)
+    - 한글은 UTF-8 로 3바이트라서, (바이트 수 - 글자 수) / 2 로 비ASCII 글자 수를 빠르게 구한다.
+    - 올림으로 계산하므로, 여러 조각의 추정치 합은 항상 합친 문자열의 추정치 이상이다.
+    """
+    non_ascii = (len(text.encode("utf-8")) - len(text)) // 2
+    return -(-(len(text) - non_ascii) // 4) - (-non_ascii // 2)
+
+
+def _truncate_to_token_budget(text: str, max_tokens: int) -> str:
+    """줄 단위로 앞에서부터 max_tokens(추정치) 안에 들어가는 만큼만 남긴다."""
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept: List[str] = []
+    used = 0
+    for line in text.split("\n"):
+        cost = _estimate_tokens(line + "\n")
+        if used + cost > max_tokens:
+            if not kept:
+                # 한 줄이 예산을 혼자 넘는 경우: 비율대로 자르고, 글자 구성이 고르지 않아 넘치면 조금씩 더 줄인다.
+                cut = line[: len(line) * max_tokens // cost]
+                while cut and _estimate_tokens(cut) > max_tokens:
+                    cut = cut[: len(cut) * 9 // 10]
+                kept.append(cut)
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
 def _strip_code_fences(text: str) -> str:
     """Remove ```json ... ``` fences if model wraps the output."""
     if not text:
@@ -85,17 +309,172 @@ def _safe_json_loads(text: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _gemini_generate_text(prompt: str) -> str:
-    """Call Gemini and return plain text."""
-    model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-    resp = model.generate_content(prompt)
+async def _gemini_generate_text_async(
+    prompt: Union[str, List[str]],
+    model: Optional[genai.GenerativeModel] = None,
+) -> str:
+    """Call Gemini (async API, does not block the event loop) and return plain text.
+
+    prompt 가 리스트면 한 요청 안의 part 들로 순서대로 보낸다. (고정 prefix + 가변 tail)
+    """
+    resp = await (model or _MODEL).generate_content_async(prompt)
     return (resp.text or "").strip()
 
 
+async def _gemini_stream_text_async(
+    prompt: Union[str, List[str]],
+    model: Optional[genai.GenerativeModel] = None,
+) -> AsyncIterator[str]:
+    """Gemini 스트리밍 호출: 응답 텍스트를 도착하는 조각 단위로 넘겨준다."""
+    resp = await (model or _MODEL).generate_content_async(prompt, stream=True)
+    async for chunk in resp:
+        # 안전 필터 등으로 part 가 없는 조각은 .text 접근 시 ValueError 가 난다.
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+
+
+# ---- Gemini 명시적 컨텍스트 캐시 (옵션) ----
+# GEMINI_CONTEXT_CACHE=1 이면 고정 지침을 CachedContent 로 올려두고 요청마다 가변 부분만 보낸다.
+# - 캐시는 첫 호출 때 만들고, TTL 이 끝나기 전에 다시 만든다.
+# - 생성/호출이 실패하면(모델 미지원, 최소 토큰 수 미달 등) 일반 호출로 진행하고 잠시 뒤 다시 시도한다.
+# - 캐시는 버전이 고정된 모델에서만 지원되므로 필요하면 GEMINI_CACHE_MODEL_NAME 으로 지정한다.
+GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE") == "1"
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+GEMINI_CACHE_MODEL_NAME = os.getenv("GEMINI_CACHE_MODEL_NAME", GEMINI_MODEL_NAME)
+
+_CONTEXT_CACHE_REFRESH_MARGIN = 120  # 만료 2분 전에 새로 만든다
+_CONTEXT_CACHE_RETRY_AFTER = 600     # 실패 후 10분 동안은 일반 호출
+
+
+class _GeminiInstruction:
+    """요청과 무관한 고정 지침 + (옵션) 그 지침을 담은 CachedContent 모델."""
+
+    def __init__(self, display_name: str, text: str) -> None:
+        self.display_name = display_name
+        self.text = text
+        self._model: Optional[genai.GenerativeModel] = None
+        self._refresh_at = 0.0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _cached_model(self) -> Optional[genai.GenerativeModel]:
+        if not GEMINI_CONTEXT_CACHE:
+            return None
+        now = time.monotonic()
+        if self._model is not None and now < self._refresh_at:
+            return self._model
+        if now < self._retry_at:
+            return None
+
+        async with self._lock:
+            now = time.monotonic()
+            if self._model is not None and now < self._refresh_at:
+                return self._model
+            try:
+                cache = await asyncio.to_thread(
+                    caching.CachedContent.create,
+                    model=GEMINI_CACHE_MODEL_NAME,
+                    display_name=self.display_name,
+                    system_instruction=self.text,
+                    ttl=timedelta(seconds=GEMINI_CONTEXT_CACHE_TTL),
+                )
+                self._model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+                self._refresh_at = now + max(
+                    GEMINI_CONTEXT_CACHE_TTL - _CONTEXT_CACHE_REFRESH_MARGIN, 60
+                )
+            except Exception as e:
+                print(f"[WARN] Gemini 컨텍스트 캐시 생성 실패 ({self.display_name}), 일반 호출로 진행: {e}")
+                self._model = None
+                self._retry_at = now + _CONTEXT_CACHE_RETRY_AFTER
+            return self._model
+
+    async def generate(self, dynamic: str) -> str:
+        """고정 지침 + 가변 부분으로 Gemini 호출. 캐시가 있으면 가변 부분만 보낸다."""
+        model = await self._cached_model()
+        if model is not None:
+            try:
+                return await _gemini_generate_text_async(dynamic, model=model)
+            except Exception as e:
+                print(f"[WARN] Gemini 컨텍스트 캐시 호출 실패 ({self.display_name}), 일반 호출로 재시도: {e}")
+                self._model = None
+                self._retry_at = time.monotonic() + _CONTEXT_CACHE_RETRY_AFTER
+
+        return await _gemini_generate_text_async([self.text, dynamic])
+
+    async def generate_stream(self, dynamic: str) -> AsyncIterator[str]:
+        """generate() 의 스트리밍 버전. 캐시 모델 호출이 첫 조각 전에 실패하면 일반 호출로 다시 시도한다."""
+        model = await self._cached_model()
+        if model is not None:
+            started = False
+            try:
+                async for text in _gemini_stream_text_async(dynamic, model=model):
+                    started = True
+                    yield text
+                return
+            except Exception as e:
+                if started:
+                    raise
+                print(f"[WARN] Gemini 컨텍스트 캐시 호출 실패 ({self.display_name}), 일반 호출로 재시도: {e}")
+                self._model = None
+                self._retry_at = time.monotonic() + _CONTEXT_CACHE_RETRY_AFTER
+
+        async for text in _gemini_stream_text_async([self.text, dynamic]):
+            yield text
+
+
+async def _gemini_generate_many(
+    requests: List[Tuple[_GeminiInstruction, str]],
+) -> List[Any]:
+    """배치로 모인 (고정 지침, 가변 프롬프트) 요청을 동시에 호출한다. 실패한 자리에는 예외 객체가 들어간다.
+
+    (google-generativeai 는 여러 프롬프트를 한 요청으로 보내는 API가 없어서 gather 로 동시 발사)
+    """
+    return await asyncio.gather(
+        *(instruction.generate(dynamic) for instruction, dynamic in requests),
+        return_exceptions=True,
+    )
+
+
+_BLOG_POST_INSTRUCTION = _GeminiInstruction("blog_post", _BLOG_POST_SYSTEM)
+_ANALYZE_MD_INSTRUCTION = _GeminiInstruction("analyze_md", _ANALYZE_MD_SYSTEM)
+_ANALYZE_JSON_INSTRUCTION = _GeminiInstruction("analyze_json", _ANALYZE_JSON_SYSTEM)
+
+# 동시에 들어온 원고 생성 요청을 모아서 한 번에 보낸다.
+# 지금 SDK 에는 여러 프롬프트를 한 요청으로 보내는 API 가 없어(_gemini_generate_many 는 gather),
+# 모으려고 기다려도 얻는 것이 없으므로 기본 대기 시간은 0 이다. (이미 쌓인 요청만 묶음)
+_gemini_batcher = MicroBatcher(
+    _gemini_generate_many,
+    max_batch_size=int(os.getenv("GEMINI_BATCH_MAX_SIZE", "4")),
+    batch_wait_timeout_s=float(os.getenv("GEMINI_BATCH_WAIT_MS", "0")) / 1000,
+)
+
+
+async def aclose_gemini_batcher() -> None:
+    """배치 수집 task 종료 (앱 shutdown 시 호출)."""
+    await _gemini_batcher.aclose()
+
+
 # ==========================
 # 1) 블로그 원고 생성 (Gemini)
 # ==========================
-def generate_blog_post(
+# 고정 지침의 (추정) 토큰 수는 import 시 한 번만 계산한다.
+_BLOG_POST_SYSTEM_TOKENS = _estimate_tokens(_BLOG_POST_SYSTEM)
+_ANALYZE_JSON_SYSTEM_TOKENS = _estimate_tokens(_ANALYZE_JSON_SYSTEM)
+_ANALYZE_MD_SYSTEM_TOKENS = _estimate_tokens(_ANALYZE_MD_SYSTEM)
+_BLOG_POST_TRIM_ORDER = ("product_detail_text", "additional_instructions", "must_keywords_block")
+_RETRY_INSTRUCTION_TOKENS = 100  # JSON 재시도 지시가 붙을 여유분
+
+
+def _fit_blog_text(blog_text: str, fixed_tokens: int) -> str:
+    """분석 프롬프트 예산에서 고정 부분(지침, URL/키워드 등)을 뺀 만큼만 본문을 남긴다."""
+    return _truncate_to_token_budget(blog_text, max(0, GEMINI_MAX_PROMPT_TOKENS - fixed_tokens))
+
+
+def _build_blog_post_prompt(
     core_keyword: str,
     product_name: Optional[str] = None,
     target_audience: Optional[str] = None,
@@ -103,10 +482,7 @@ def generate_blog_post(
     additional_instructions: Optional[str] = None,
     **extra_fields: Any,
 ) -> str:
-    """
-    네이버 상위 노출 기준(문단 수, 단어 수, FAQ, VIDEO, 금지어 등)을
-    반영해서 블로그 원고를 생성한다.
-    """
+    """원고 생성 요청의 가변 부분(user prompt)을 만든다. 고정 지침은 _BLOG_POST_SYSTEM."""
 
     # ---------- 폼 값 정리 ----------
     brand: Optional[str] = extra_fields.get("brand")
@@ -121,26 +497,9 @@ def generate_blog_post(
     must_keywords = _split_csv(must_keywords_raw)
     must_headings = _split_csv(must_headings_raw)
 
-    # 기본 금지어 + 사용자 금지어
-    default_banned = [
-        "효과",
-        "효능",
-        "개선",
-        "주름개선",
-        "탄력개선",
-        "리프팅",
-        "안티에이징",
-        "치료",
-        "치유",
-        "회복",
-        "통증 완화",
-        "스트레스 완화",
-        "임상",
-        "임상으로 입증",
-    ]
-    user_banned = _split_csv(banned_terms_raw)
-    banned_terms_list = sorted(set(default_banned + user_banned))
-    banned_terms_str = ", ".join(banned_terms_list) if banned_terms_list else "없음"
+    # 기본 금지어는 고정 프롬프트에 들어 있으므로, 여기서는 사용자가 추가한 것만 뒤쪽에 붙인다.
+    extra_banned = sorted(set(_split_csv(banned_terms_raw)) - _DEFAULT_BANNED)
+    extra_banned_terms = ", ".join(extra_banned) if extra_banned else "없음"
 
     # 기본값 채우기
     product_name = product_name or "(제품명 미입력)"
@@ -160,130 +519,314 @@ def generate_blog_post(
     )
 
     # ---------- 프롬프트 구성 ----------
-    system_prompt = f"""
-너는 네이버 블로그 상위노출을 목표로 글의 형식과 구조를 엄격히 맞춰 생성하는 카피에디터다.
-상위 노출된 블로그 vs 비상위 노출 블로그의 차이를 잘 알고 있으며,
-상위 노출 글의 패턴(문단 구성, 톤, CTA, FAQ, VIDEO, 키워드 분산)을 최대한 재현하고,
-비상위 글에서 자주 보이는 문제(키워드 스팸, 과장 카피, 문단 길이 불균형 등)는 피해야 한다.
-
-[상위 노출 구조 기준]
-다음 기준을 가능한 한 엄격히 맞추려고 노력하라. 완벽히 일치하지 않더라도,
-이 범위를 목표로 글의 길이와 구조를 조정한다.
-
-[기준]
-    - 문단수: 180~230개 <p> 문단을 선호한다.
-    - 단어수: 650~700 단어를 목표로 하되, ±10~15%% 범위 안에서 변동을 허용한다.
-    - 서론 100자 내:
-        · 핵심 키워드(예: "{core_keyword}")가 최소 1회 등장해야 한다.
-        · 제품명(예: "{product_name}")이 최소 1회 자연스럽게 등장해야 한다.
-    - FAQ: 본문 중간~하단에 질문/답변 형식의 FAQ 문단을 최소 2개 포함한다.
-        · 예: "<strong>Q.</strong> ~?" / "<strong>A.</strong> ~" 형식
-    - VIDEO 슬롯: 영상으로 보완 설명을 볼 수 있는 느낌의 '영상 추천' 문단을 2~3개 포함한다.
-        · 예: "<strong>영상으로 보면 더 이해가 쉬운 포인트</strong>" 로 시작하는 문단 등
-    - 제품명 등장 총량:
-        · 제품명("{product_name}")은 전체 본문에서 3~10회 정도 자연스럽게 분산 등장해야 한다.
-        · 같은 문장을 반복하거나, 리스트처럼 나열하는 스팸 형태는 금지한다.
-        · 허위 정보(존재하지 않는 성분, 사실이 아닌 혜택 등)는 절대 만들어내지 않는다.
-    - 신제품 전제:
-        · "이미 수많은 후기", "압도적인 판매량", "국민템"과 같이 사회적 증거를 과장하는 표현은 사용하지 않는다.
-        · 특히 통계/수치/랭킹을 임의로 만들지 않는다.
-    - 금지어:
-        · 다음 금지어 및 동의어를 직접적으로 사용하지 않는다: {banned_terms_str}
-        · 대신 "제 경험상 ~하게 느꼈다", "저한테는 ~가 편했다", "개인차가 있을 수 있다" 같은 체감/인상 중심 표현으로 대체한다.
-
-[형식 및 문체 지침]
-1) 전체는 HTML로 출력하며, 각 문장은 반드시 1개의 <p> ... </p>로 감싼다.
-   - 한 문단 = 한 문장 스타일을 지키고, 문장마다 줄바꿈되는 네이버 블로그 트렌드를 따른다.
-2) HPSB 구조를 적용한다: Hook → Problem → Solution → Benefit → CTA
-   - 각 섹션 시작부에 <strong>섹션명</strong> 을 넣되,
-     과도한 H 태그나 마크다운(#, *, - 등)은 사용하지 않는다.
-3) 마크다운 문법(#, *, -, ``` 등)을 절대 사용하지 않는다.
-   - 오직 HTML 태그(<p>, <strong> 등)만 사용하고, 나머지는 순수 텍스트로 쓴다.
-4) 광고성 과장 문구(“인생템”, “무조건 사야 함”, “완벽하게 해결” 등)는 피하고,
-   솔직한 체험/후기 톤을 유지한다.
-5) 피부/건강 관련 표현은 효능을 단정하지 말고,
-   '관리/케어/루틴' 중심으로 부드럽게 서술한다.
-"""
-
-    user_prompt = f"""
-[컨텍스트]
-- 핵심 키워드: {core_keyword}
-- 제품명: {product_name}
-- 브랜드: {brand}
-- 글 의도: {intent}
-- 대상 독자: {target_audience}
-- 페르소나/톤: {persona} / {tone}
-- CTA 유형: {cta_text}
-
-[콘텐츠 구성 요구]
-1) HPSB 구조를 따른다.
-   - Hook: 독자의 상황/고민에 공감하는 한두 문장
-   - Problem: 키워드와 관련된 구체적인 고민/상황 설명
-   - Solution: 제품/서비스를 중심으로 한 해결 방향, 사용법, 특징
-   - Benefit: 실제 사용감/체감/상황 변화 위주(개인 경험 톤)
-   - CTA: 독자가 "{cta_text}" 행동을 할 수 있도록 자연스럽게 유도
-2) 서론 100자 안에 핵심 키워드와 제품명이 1회 이상 등장하도록 유도한다.
-3) 본문 전체에서:
-   - 핵심 키워드와 연관 키워드가 자연스럽게 여러 번 등장하되, 스팸처럼 보이지 않도록 한다.
-4) 필수 포함 키워드(가능한 한 모두 자연스럽게 포함):
-{must_keywords_block}
-
-5) 필수 포함 소제목(섹션 구조에 녹여서 사용, <strong>소제목</strong> 형태 허용):
-{must_headings_block}
-
-6) FAQ 구성:
-   - 중간~하단부에 최소 2개의 Q&A 문단을 만든다.
-   - 형식 예시:
-     · <strong>Q.</strong> oo가 궁금했어요
-     · <strong>A.</strong> 제가 사용해보니 ~ 이런 느낌이었어요 (개인차 고지 포함)
-7) VIDEO 슬롯 구성:
-   - 영상으로 내용을 보완한다는 느낌의 문단을 2~3개 포함한다.
-   - 예: "<strong>영상으로 보면 더 이해가 쉬운 포인트</strong>"로 시작해서,
-     어느 부분을 영상으로 보면 좋은지 설명하는 문단.
-
-[제품 브리프/상세 정보]
-아래 제품 관련 정보를 참고해 구체적인 디테일과 맥락을 추가하되,
-허위·추정 정보는 만들지 말고, 모르는 부분은 안전하게 넘어가라.
-
-{product_detail_text}
-
-[추가 요청 사항]
-{additional_instructions}
-
-[출력 형식]
-- 전체 결과를 HTML <p> ... </p> 문장들로만 출력한다.
-- 한 문장은 반드시 1개의 <p> ... </p> 태그로 감싼다.
-- <ARTICLE>, <FAQ>, <VIDEOS> 같은 별도의 메타 태그는 쓰지 말고,
-  FAQ/VIDEO는 위에서 설명한 문장 구조(굵은 제목 + 일반 문장)로만 표현한다.
-- 마크다운 문법(#, *, -, ``` 등)을 절대 사용하지 않는다.
-- CTA 문단에서는 자연스럽게 "{cta_text}" 행동을 유도하는 문장을 포함한다.
-"""
-
-    full_prompt = system_prompt + "\n\n" + user_prompt
+    # 고정 지침(_BLOG_POST_SYSTEM)을 항상 맨 앞에, 요청마다 바뀌는 입력값은 뒤에 붙인다.
+    # 앞부분이 매번 바이트 단위로 같아야 Gemini 의 prefix(implicit) 캐시가 적중한다.
+    fields = {
+        "core_keyword": core_keyword,
+        "product_name": product_name,
+        "brand": brand,
+        "intent": intent,
+        "target_audience": target_audience,
+        "persona": persona,
+        "tone": tone,
+        "cta_text": cta_text,
+        "extra_banned_terms": extra_banned_terms,
+        "must_keywords_block": must_keywords_block,
+        "must_headings_block": must_headings_block,
+        "product_detail_text": product_detail_text,
+        "additional_instructions": additional_instructions,
+    }
+    user_prompt = _BLOG_POST_USER_PROMPT.substitute(fields)
+
+    # ---------- 길이 점검 ----------
+    # 예산을 넘으면 제품 브리프 → 추가 요청 → 필수 키워드 순으로 넘친 만큼 잘라낸다.
+    budget = GEMINI_MAX_PROMPT_TOKENS - _BLOG_POST_SYSTEM_TOKENS
+    for name in _BLOG_POST_TRIM_ORDER:
+        over = _estimate_tokens(user_prompt) - budget
+        if over <= 0:
+            break
+        keep = max(0, _estimate_tokens(fields[name]) - over)
+        fields[name] = _truncate_to_token_budget(fields[name], keep)
+        user_prompt = _BLOG_POST_USER_PROMPT.substitute(fields)
+
+    if _estimate_tokens(user_prompt) > budget:
+        raise RuntimeError("입력값이 너무 깁니다. 제품 브리프나 요청 사항을 줄여주세요.")
+    return user_prompt
+
+
+def _blog_post_cache_key(user_prompt: str) -> Optional[str]:
+    # 입력값이 모두 user_prompt 에 들어가므로, 프롬프트가 같으면 같은 요청이다.
+    if not GEMINI_CACHE_GENERATED_POSTS:
+        return None
+    return _response_cache_key("blog_post", user_prompt)
+
+
+@lru_cache(maxsize=128)
+def _banned_regex(user_terms: Tuple[str, ...]) -> "re.Pattern[str]":
+    """기본 금지어 + 사용자 금지어를 하나의 정규식(alternation)으로 컴파일한다. 같은 조합은 재사용."""
+    # 긴 표현을 먼저 두어야 "주름개선" 이 "개선" 보다 먼저 잡힌다.
+    terms = sorted(_DEFAULT_BANNED | set(user_terms), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, terms)))
+
+
+def find_banned_terms(text: str, banned_terms: Optional[str] = None) -> List[str]:
+    """생성된 원고에 남아 있는 금지어 목록 (기본 금지어 + 폼에서 받은 금지어, 중복 없이 정렬)."""
+    user_terms = tuple(sorted(set(_split_csv(banned_terms))))
+    return sorted(set(_banned_regex(user_terms).findall(text)))
+
+
+def _warn_banned_leaks(text: str, banned_terms: Optional[str]) -> None:
+    leaked = find_banned_terms(text, banned_terms)
+    if leaked:
+        print(f"[WARN] 생성된 원고에 금지어가 포함되어 있습니다: {', '.join(leaked)}")
+
+
+def finalize_blog_post(text: str) -> str:
+    """안전장치: <p> 태그가 하나도 없으면 줄단위로 <p>로 감싸주기 (스트리밍은 다 받은 뒤 호출)"""
+    text = text.strip()
+    if "<p" not in text:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        text = "\n".join(f"<p>{line}</p>" for line in lines)
+    return text
+
+
+async def generate_blog_post(
+    core_keyword: str,
+    product_name: Optional[str] = None,
+    target_audience: Optional[str] = None,
+    tone: Optional[str] = None,
+    additional_instructions: Optional[str] = None,
+    **extra_fields: Any,
+) -> str:
+    """
+    네이버 상위 노출 기준(문단 수, 단어 수, FAQ, VIDEO, 금지어 등)을
+    반영해서 블로그 원고를 생성한다.
+    """
+    user_prompt = _build_blog_post_prompt(
+        core_keyword, product_name, target_audience, tone, additional_instructions, **extra_fields
+    )
+
+    cache_key = _blog_post_cache_key(user_prompt)
+    if cache_key is not None:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     # ---------- Gemini 호출 ----------
     try:
-        text = _gemini_generate_text(full_prompt)
+        text = finalize_blog_post(
+            await _gemini_batcher.submit((_BLOG_POST_INSTRUCTION, user_prompt))
+        )
+        _warn_banned_leaks(text, extra_fields.get("banned_terms"))
+        if cache_key is not None:
+            _response_cache[cache_key] = text
+        return text
+    except Exception as e:
+        raise RuntimeError(f"Gemini 호출 실패: {e}")
 
-        # 안전장치: <p> 태그가 하나도 없으면 줄단위로 <p>로 감싸주기
-        if "<p" not in text:
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            text = "\n".join(f"<p>{line}</p>" for line in lines)
 
-        return text
+async def generate_blog_post_stream(
+    core_keyword: str,
+    product_name: Optional[str] = None,
+    target_audience: Optional[str] = None,
+    tone: Optional[str] = None,
+    additional_instructions: Optional[str] = None,
+    **extra_fields: Any,
+) -> AsyncIterator[str]:
+    """
+    generate_blog_post 와 같은 입력으로, 생성되는 원고를 조각(chunk) 단위로 바로 흘려보낸다.
+    첫 조각이 나오는 대로 화면에 보여줄 수 있어서 체감 대기 시간이 짧다.
+    (배칭은 거치지 않는다. 다 받은 뒤 저장할 때는 finalize_blog_post() 로 마무리)
+    """
+    user_prompt = _build_blog_post_prompt(
+        core_keyword, product_name, target_audience, tone, additional_instructions, **extra_fields
+    )
+
+    cache_key = _blog_post_cache_key(user_prompt)
+    if cache_key is not None:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks: List[str] = []
+    try:
+        async for chunk in _BLOG_POST_INSTRUCTION.generate_stream(user_prompt):
+            chunks.append(chunk)
+            yield chunk
     except Exception as e:
         raise RuntimeError(f"Gemini 호출 실패: {e}")
 
+    text = finalize_blog_post("".join(chunks))
+    _warn_banned_leaks(text, extra_fields.get("banned_terms"))
+    if cache_key is not None:
+        _response_cache[cache_key] = text
+
 
 # ==========================
 # 2) 네이버 블로그 본문 크롤링 (iframe 대응)
 # ==========================
-def scrape_url_content(url: str) -> str:
+# 본문 페이지에서는 스마트에디터 ONE 본문 컨테이너만 트리로 만든다.
+_SE_MAIN_STRAINER = SoupStrainer("div", attrs={"class": re.compile(r"\bse-main-container\b")})
+
+# 스마트에디터 ONE 컨테이너가 없을 때(구형 에디터 등)는 lxml 로 직접 파싱해서 순서대로 찾는다.
+# 셀렉터/텍스트 추출은 import 시 한 번만 컴파일한 XPath 로 처리한다. (libxml2 안에서 순회)
+_FALLBACK_XPATHS = tuple(
+    etree.XPath(xp)
+    for xp in (
+        "//*[@id='postViewArea']",    # 구형 에디터
+        "//div[@id='contentArea']",
+    )
+)
+# 공백만 있는 텍스트와 script/style 안의 텍스트는 제외 (BeautifulSoup get_text 와 같은 기준)
+_TEXT_NODES_XPATH = etree.XPath(
+    ".//text()[normalize-space()][not(ancestor::script) and not(ancestor::style)]"
+)
+
+
+def _node_text(node: Any) -> str:
+    return "\n".join(t.strip() for t in _TEXT_NODES_XPATH(node))
+
+
+def _extract_main_text(html: str) -> str:
+    """본문 HTML 에서 텍스트를 뽑는다. (요즘 글은 대부분 se-main-container 라서 부분 파싱으로 끝난다)"""
+    node = BeautifulSoup(html, "lxml", parse_only=_SE_MAIN_STRAINER).find("div")
+    if node:
+        text = node.get_text(separator="\n", strip=True)
+        if text:
+            return text
+
+    # bytes 로 다시 파싱할 때도 빈 문서면 ParserError 가 나므로 두 경로를 함께 감싼다.
+    try:
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # <?xml encoding=...?> 선언이 있는 문서는 str 로 파싱할 수 없어서 bytes 로 넘긴다.
+            root = lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        raise RuntimeError("본문을 찾을 수 없습니다. (body 요소 없음)")
+
+    for xpath in _FALLBACK_XPATHS:
+        found = xpath(root)
+        if found:
+            text = _node_text(found[0])
+            if text:
+                return text
+            break
+
+    body = root.find("body")
+    if body is None:
+        raise RuntimeError("본문을 찾을 수 없습니다. (body 요소 없음)")
+    return _node_text(body)
+
+
+_MAINFRAME_TAG_RE = re.compile(rb"<iframe\b[^>]*\bid\s*=\s*[\"']mainFrame[\"'][^>]*>", re.IGNORECASE)
+_SRC_ATTR_RE = re.compile(rb"\bsrc\s*=\s*[\"']([^\"']*)[\"']", re.IGNORECASE)
+
+
+_DESKTOP_POST_URL_RE = re.compile(
+    r"^https?://blog\.naver\.com/([A-Za-z0-9_-]+)/(\d+)/?(?:[?#].*)?$"
+)
+
+
+def _derive_postview_url(url: str) -> Optional[str]:
+    """blog.naver.com/{blogId}/{logNo} 형태면 본문 iframe(PostView) 주소를 만든다. 아니면 None."""
+    m = _DESKTOP_POST_URL_RE.match(url)
+    if not m:
+        return None
+    return f"https://blog.naver.com/PostView.naver?blogId={m.group(1)}&logNo={m.group(2)}"
+
+
+async def _fetch_iframe_src_or_html(
+    url: str, headers: Dict[str, str]
+) -> Tuple[Optional[str], Optional[httpx.Response], bytes]:
+    """
+    첫 페이지를 스트리밍으로 받으면서 iframe#mainFrame 태그를 찾는다.
+    - 찾으면 나머지 본문은 받지 않고 끊는다 → (src, None, b"")  (src 속성이 없으면 "")
+    - 끝까지 없으면 이 페이지가 본문이다 → (None, 응답, 전체 HTML 바이트)
+    """
+    resp = await _get_with_retry(_http, url, headers=headers, stream=True)
+    try:
+        resp.raise_for_status()
+        buf = bytearray()
+        async for chunk in resp.aiter_bytes():
+            # 태그가 청크 경계에 걸칠 수 있으니 직전 청크 끝부분부터 다시 본다.
+            scan_from = max(0, len(buf) - 1024)
+            buf += chunk
+            m = _MAINFRAME_TAG_RE.search(buf, scan_from)
+            if m:
+                src = _SRC_ATTR_RE.search(m.group(0))
+                return (html_lib.unescape(src.group(1).decode("utf-8", "replace")) if src else ""), None, b""
+        return None, resp, bytes(buf)
+    finally:
+        await resp.aclose()
+
+
+# ---- 본문 페이지 재검증 ----
+# 같은 글을 반복해서 분석/모니터링할 때, 바뀌지 않은 페이지는 다시 받거나 파싱하지 않는다.
+# - 이전 응답의 ETag / Last-Modified 로 조건부 요청 → 304 면 저장해 둔 텍스트 사용
+# - 검증 헤더가 없거나 200 이 와도, 본문 해시가 같으면 파싱을 건너뛴다.
+SCRAPE_REVALIDATE_TTL = int(os.getenv("SCRAPE_REVALIDATE_TTL", "86400"))
+
+
+class _PageMemo(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+    text: str
+
+
+_page_memo: TTLCache = TTLCache(maxsize=512, ttl=SCRAPE_REVALIDATE_TTL)
+
+
+def _conditional_headers(page_url: str, headers: Dict[str, str]) -> Dict[str, str]:
+    prev: Optional[_PageMemo] = _page_memo.get(page_url)
+    if prev is None:
+        return headers
+    headers = dict(headers)
+    if prev.etag:
+        headers["If-None-Match"] = prev.etag
+    if prev.last_modified:
+        headers["If-Modified-Since"] = prev.last_modified
+    return headers
+
+
+async def _page_text(page_url: str, resp: httpx.Response, raw: bytes) -> str:
+    """본문 페이지 응답에서 텍스트를 뽑는다. 304 이거나 내용이 이전과 같으면 저장해 둔 결과를 쓴다."""
+    prev: Optional[_PageMemo] = _page_memo.get(page_url)
+    if resp.status_code == 304 and prev is not None:
+        return prev.text
+    resp.raise_for_status()
+
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    if prev is not None and prev.digest == digest:
+        text = prev.text
+    else:
+        # 파싱은 CPU 작업이라, 큰 페이지에서도 다른 요청 처리가 멈추지 않도록 스레드에서 돌린다.
+        html = raw.decode(resp.encoding or "utf-8", errors="replace")
+        text = await asyncio.to_thread(_extract_main_text, html)
+
+    _page_memo[page_url] = _PageMemo(
+        etag=resp.headers.get("etag"),
+        last_modified=resp.headers.get("last-modified"),
+        digest=digest,
+        text=text,
+    )
+    return text
+
+
+async def scrape_url_content(url: str) -> str:
     """
     네이버 블로그 URL에서 본문 텍스트를 크롤링해서 반환한다.
     네이버 블로그는 보통 iframe(mainFrame) 안에 본문이 있기 때문에
     2단계 요청을 수행한다.
+    결과는 URL 기준으로 SCRAPE_CACHE_TTL 동안 캐시한다.
     """
+    cache_key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    cached = _scrape_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     headers = {
         "User-Agent": (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -292,57 +835,39 @@ def scrape_url_content(url: str) -> str:
         )
     }
 
-    # 1) 첫 페이지 요청
-    r1 = requests.get(url, headers=headers, timeout=10)
-    r1.raise_for_status()
-
-    soup1 = BeautifulSoup(r1.text, "html.parser")
-
-    iframe = soup1.select_one("iframe#mainFrame")
-    if not iframe:
-        # iframe이 없으면 그냥 이 페이지에서 바로 본문을 찾는다.
-        soup2 = soup1
-    else:
-        iframe_src = iframe.get("src")
-        if not iframe_src:
-            raise RuntimeError("네이버 블로그 iframe src를 찾을 수 없습니다.")
-
-        if iframe_src.startswith("/"):
-            iframe_url = "https://blog.naver.com" + iframe_src
-        else:
-            iframe_url = iframe_src
-
-        r2 = requests.get(iframe_url, headers=headers, timeout=10)
-        r2.raise_for_status()
-        soup2 = BeautifulSoup(r2.text, "html.parser")
-
-    selectors = [
-        "div.se-main-container",  # 스마트에디터 ONE
-        "#postViewArea",          # 구형 에디터
-        "div#postViewArea",
-        "div#contentArea",
-    ]
-
-    text = ""
-    for sel in selectors:
-        node = soup2.select_one(sel)
-        if node:
-            text = node.get_text(separator="\n", strip=True)
-            break
+    # 1) 데스크톱 글 주소(blog.naver.com/{blogId}/{logNo})는 iframe(PostView) 주소를 바로 만들 수 있어서
+    #    첫 페이지 요청을 건너뛴다.
+    page_url = url
+    iframe_url = _derive_postview_url(url)
+    if iframe_url is None:
+        # 그 밖의 주소는 첫 페이지를 iframe 태그가 나오는 지점까지만 읽는다.
+        # iframe이 없으면 그냥 첫 페이지에서 바로 본문을 찾는다.
+        iframe_src, resp, raw = await _fetch_iframe_src_or_html(url, headers)
+        if iframe_src is not None:
+            if not iframe_src:
+                raise RuntimeError("네이버 블로그 iframe src를 찾을 수 없습니다.")
+
+            if iframe_src.startswith("/"):
+                iframe_url = "https://blog.naver.com" + iframe_src
+            else:
+                iframe_url = iframe_src
+
+    if iframe_url is not None:
+        page_url = iframe_url
+        resp = await _get_with_retry(
+            _http, iframe_url, headers=_conditional_headers(iframe_url, headers)
+        )
+        raw = resp.content
 
-    if not text.strip():
-        body = soup2.body
-        if not body:
-            raise RuntimeError("본문을 찾을 수 없습니다. (body 요소 없음)")
-        text = body.get_text(separator="\n", strip=True)
+    text = await _page_text(page_url, resp, raw)
 
     if not text.strip():
         raise RuntimeError("본문 텍스트가 비어 있습니다. 다른 URL을 시도해보세요.")
 
-    max_len = 8000
-    if len(text) > max_len:
-        text = text[:max_len]
+    # 글자 수가 아니라 (추정) 토큰 수로 자른다. 한글 비중에 따라 같은 글자 수라도 토큰 수가 크게 달라진다.
+    text = _truncate_to_token_budget(text, GEMINI_MAX_INPUT_TOKENS)
 
+    _scrape_cache[cache_key] = text
     return text
 
 
@@ -352,7 +877,7 @@ def scrape_url_content(url: str) -> str:
 #    - JSON(신규): analyze_blog_post_json()
 # ==========================
 
-def analyze_blog_post_json(
+async def analyze_blog_post_json(
     blog_text: str,
     core_keyword: str,
     blog_url: str,
@@ -367,84 +892,36 @@ def analyze_blog_post_json(
     This is designed for '서비스 UI' 목적: JSON으로 받아서 HTML로 예쁘게 뿌릴 수 있게.
     """
 
-    json_schema_hint = {
-        "summary": "한 줄 요약",
-        "scores": {"seo": 0, "readability": 0, "structure": 0, "keyword": 0},
-        "issues": [
-            {
-                "severity": "high|medium|low",
-                "title": "문제 제목",
-                "evidence": "근거(원문 일부/패턴)",
-                "impact": "왜 문제인지",
-                "fix": "어떻게 고칠지(구체 지시)",
-            }
-        ],
-        "rewrite_plan": ["1순위 수정", "2순위 수정"],
-        "suggested_outline": ["Hook", "Problem", "Solution", "Benefit", "CTA"],
-        "faq": [{"q": "질문", "a": "답변"}],
-        "video_slots": ["영상 추천 문단 1", "영상 추천 문단 2"],
-        "keyword_distribution": {
-            "core_keyword": {"target": "자연스러운 분산", "notes": "스팸 금지"}
-        },
-        "final_checklist": ["서론 100자 내 키워드 포함", "FAQ 2개 이상"],
-        "metrics": {
-            "estimated_paragraphs": 0,
-            "estimated_words": 0,
-            "intro_has_keyword": True,
-            "intro_has_brand_or_product": True,
-            "faq_count": 0,
-            "video_slot_count": 0,
-        },
-    }
+    # 고정 지침(스키마 예시 포함)은 app/prompts/analyze_json_system.tmpl 로 항상 앞에 두고,
+    # URL/키워드/본문은 뒤에 붙인다. (URL 이 달라도 앞부분 prefix 캐시가 적중)
+    blog_text = _fit_blog_text(
+        blog_text,
+        _ANALYZE_JSON_SYSTEM_TOKENS
+        + _RETRY_INSTRUCTION_TOKENS * max_retries
+        + _estimate_tokens(
+            _ANALYZE_JSON_USER_PROMPT.substitute(blog_url=blog_url, core_keyword=core_keyword, blog_text="")
+        ),
+    )
+    prompt = _ANALYZE_JSON_USER_PROMPT.substitute(
+        blog_url=blog_url,
+        core_keyword=core_keyword,
+        blog_text=blog_text,
+    )
 
-    prompt = f"""
-너는 네이버 블로그 상위노출을 목표로 글을 점검하는 SEO 컨설턴트다.
-아래 [기준]은 상위노출/비상위노출 블로그들을 분석해서 정리한 기준이다.
-반드시 [출력 형식]을 지켜서 **JSON만** 출력하라.
-
-[분석 대상]
-- URL: {blog_url}
-- 핵심 키워드: {core_keyword}
-
-[기준]
-- 문단수: 180~230개 <p> 문단 선호
-- 단어수: 650~700 단어 목표(±10~15%% 허용)
-- 서론 100자 내:
-  · 핵심 키워드 ≥ 1회
-  · 제품명 또는 주요 브랜딩 키워드 ≥ 1회
-- FAQ: 최소 2개 (Q/A 형식)
-- VIDEO 슬롯: 2~3개 (영상으로 설명 보완하는 느낌의 문단)
-- 제품명 등장 총량: 3~10회 (자연스럽게 분산, 스팸 금지)
-- 신제품 전제: "압도적 판매량", "국민템" 등 사회적 증거 과장 금지
-- 금지어: 직·간접 효능 표현(효과, 효능, 개선, 리프팅, 안티에이징, 치료, 치유, 회복, 통증 완화, 스트레스 완화, 임상 입증 등) 사용 금지.
-  · 대신 '체감', '느낌', '개인차' 표현으로 완화.
-
-[본문 원문]
-[ORIGINAL_BLOG_CONTENT_START]
-{blog_text}
-[ORIGINAL_BLOG_CONTENT_END]
-
-[반드시 포함할 JSON 스키마]
-- 아래 키를 모두 포함하라. 값이 없으면 빈 배열/빈 문자열/0/false 등으로 채워라.
-- 타입을 반드시 지켜라.
-- scores는 0~100 정수.
-
-스키마 예시(형태 참고용):
-{json.dumps(json_schema_hint, ensure_ascii=False)}
-
-[출력 형식]
-- 출력은 오직 JSON 1개 객체만 허용한다.
-- ```json 같은 코드펜스, 설명 문장, 마크다운, 목록, HTML을 절대 포함하지 마라.
-- 반드시 {{"summary": ...}} 로 시작하는 JSON 객체로 출력하라.
-"""
+    # 파싱에 성공한 결과만 캐시한다. (실패 응답을 캐시하면 재시도해도 계속 실패가 나온다)
+    cache_key = _response_cache_key("analyze_json", prompt)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     last_text = ""
     for attempt in range(max_retries + 1):
         try:
-            last_text = _gemini_generate_text(prompt)
+            last_text = await _ANALYZE_JSON_INSTRUCTION.generate(prompt)
             json_text = _extract_json_object(last_text)
             data = _safe_json_loads(json_text)
             if isinstance(data, dict):
+                _response_cache[cache_key] = (data, last_text)
                 return data, last_text
         except Exception as e:
             last_text = f"(Gemini JSON 분석 호출 실패: {e})"
@@ -458,7 +935,27 @@ def analyze_blog_post_json(
     return None, last_text
 
 
-def analyze_blog_post(
+async def _embed_for_semantic_cache(text: str) -> List[float]:
+    result = await genai.embed_content_async(
+        model=GEMINI_EMBED_MODEL_NAME,
+        content=text,
+        task_type="semantic_similarity",
+    )
+    return result["embedding"]
+
+
+async def _same_analysis_applies(core_keyword: str, previous_text: str, current_text: str) -> bool:
+    """유사도가 애매한 구간에서, 이전 분석을 그대로 써도 되는지 Gemini 에 YES/NO 로 확인한다."""
+    prompt = _SEMANTIC_VERIFY_PROMPT.substitute(
+        core_keyword=core_keyword,
+        previous_text=previous_text,
+        current_text=current_text,
+    )
+    answer = await _gemini_generate_text_async(prompt)
+    return answer.strip().upper().startswith("YES")
+
+
+async def analyze_blog_post(
     blog_text: str,
     core_keyword: str,
     blog_url: str,
@@ -468,81 +965,93 @@ def analyze_blog_post(
     SEO/상위노출 기준에 따른 분석 + 개선안을 마크다운 형식으로 생성한다.
     """
 
-    analysis_prompt = f"""
-너는 네이버 블로그 상위노출을 목표로 글을 점검하는 SEO 컨설턴트다.
-아래 [기준]은 이미 상위노출/비상위노출 블로그들을 분석해서 정리한 기준이다.
-이 기준을 최대한 반영해서 본문을 평가하고, 구체적인 수정 제안을 제시하라.
-
-[분석 대상]
-- URL: {blog_url}
-- 핵심 키워드: {core_keyword}
-
-[기준]
-- 문단수: 180~230개 <p> 문단 선호
-- 단어수: 650~700 단어 목표(±10~15%% 허용)
-- 서론 100자 내:
-  · 핵심 키워드 ≥ 1회
-  · 제품명 또는 주요 브랜딩 키워드 ≥ 1회
-- FAQ: 최소 2개 (Q/A 형식)
-- VIDEO 슬롯: 2~3개 (영상으로 설명 보완하는 느낌의 문단)
-- 제품명 등장 총량: 3~10회 (자연스럽게 분산, 스팸 금지)
-- 신제품 전제: "압도적 판매량", "국민템" 등 사회적 증거 과장 금지
-- 금지어: 직·간접 효능 표현(효과, 효능, 개선, 리프팅, 안티에이징, 치료, 치유, 회복, 통증 완화, 스트레스 완화, 임상 입증 등) 사용 금지.
-  · 대신 '체감', '느낌', '개인차' 표현으로 완화.
-
-[본문 원문]
-아래는 네이버 블로그에서 크롤링한 현재 본문이다.
-
-[ORIGINAL_BLOG_CONTENT_START]
-{blog_text}
-[ORIGINAL_BLOG_CONTENT_END]
-
-[요구 사항]
-아래 항목을 **마크다운 형식으로** 작성하라. (제목, 번호 목록, 표 등을 적극 활용하라.)
-
-1. ## 전체 구조 진단
-   - 문단수/단어수 추정 (대략적인 범위로 설명)
-   - 도입부(서론)의 역할과 키워드/제품명 노출 여부
-   - HPSB(Hook-Problem-Solution-Benefit-CTA) 관점에서 어느 단계가 약한지 요약
-
-2. ## 키워드 & 문장 수준 최적화
-   - 핵심 키워드 및 연관 키워드 사용 패턴 평가
-   - 키워드 스팸 의심 구간이 있다면 지적
-   - 자연스럽게 키워드를 추가/치환할 수 있는 구체적인 문장 예시 제안
-
-3. ## 구조 개선안 (섹션/문단 단위)
-   - 추천하는 섹션 구성 예시 (마크다운 목록으로)
-   - 현재 글에서 “이 문단은 위 섹션으로 이동하면 좋다” 같은 재배치 제안
-   - FAQ/VIDEO 슬롯이 없다면 어디에 어떤 형태로 넣으면 좋은지 예시 작성
-
-4. ## 규제/리스크 체크리스트
-   - 효능·효과를 단정하는 표현이 있는지 여부
-   - 사회적 증거 과장이 의심되는 구간
-   - 표현을 어떻게 바꾸면 안전해지는지, 전/후 문장 예시로 제시
-
-5. ## 리라이트 샘플 (부분 발췌)
-   - 본문 중 중요한 2~3개 구간을 선택해,
-     상위노출 기준을 반영해 “리라이트된 버전”을 마크다운 문단으로 제시
-   - 원문과 비교했을 때 어떤 점이 좋아졌는지 간단 코멘트
-
-[출력 형식 주의]
-- 전체 답변은 마크다운 형식으로만 작성한다.
-- HTML 태그(<p>, <strong> 등)는 사용하지 않는다.
-- 한국어로 작성한다.
-- 제목/소제목/리스트/강조 등 마크다운 문법을 적극 활용해,
-  사람이 바로 읽고 Notion이나 문서에 붙여넣기 좋게 정리한다.
-"""
+    blog_text = _fit_blog_text(
+        blog_text,
+        _ANALYZE_MD_SYSTEM_TOKENS
+        + _estimate_tokens(
+            _ANALYZE_MD_USER_PROMPT.substitute(blog_url=blog_url, core_keyword=core_keyword, blog_text="")
+        ),
+    )
+    user_prompt = _ANALYZE_MD_USER_PROMPT.substitute(
+        blog_url=blog_url,
+        core_keyword=core_keyword,
+        blog_text=blog_text,
+    )
+
+    cache_key = _response_cache_key("analyze_md", user_prompt)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # 의미 유사도 캐시: 임베딩/검증 호출이 실패해도 분석 자체는 그대로 진행한다.
+    namespace = (blog_url, core_keyword)
+    source_text = f"{core_keyword}\n{blog_text[:SEMANTIC_CACHE_SOURCE_CHARS]}"
+    # 임베딩은 앞부분만 보므로, 뒷부분만 고친 글을 구분하려고 전체 본문의 digest 를 같이 저장한다.
+    source_digest = _response_cache_key("semantic_source", blog_text)
+    embedding: Optional[List[float]] = None
+    if SEMANTIC_CACHE_ENABLED:
+        try:
+            embedding = await _embed_for_semantic_cache(source_text)
+            hit = _semantic_cache.lookup(namespace, embedding)
+            if hit is not None:
+                similarity, previous_text, previous_digest, previous_result = hit
+                # 본문이 임베딩 범위를 넘으면 유사도만으로는 뒷부분 수정을 알 수 없으므로 항상 검증한다.
+                fast_path = (
+                    similarity >= _semantic_cache.hit_threshold
+                    and len(blog_text) <= SEMANTIC_CACHE_SOURCE_CHARS
+                )
+                if (
+                    previous_digest == source_digest
+                    or fast_path
+                    or await _same_analysis_applies(core_keyword, previous_text, source_text)
+                ):
+                    _response_cache[cache_key] = previous_result
+                    return previous_result
+        except Exception as e:
+            print(f"[WARN] 의미 유사도 캐시 조회 실패: {e}")
 
     try:
-        text = _gemini_generate_text(analysis_prompt)
-        return text
+        text = await _ANALYZE_MD_INSTRUCTION.generate(user_prompt)
     except Exception as e:
         raise RuntimeError(f"블로그 분석 Gemini 호출 실패: {e}")
 
+    _response_cache[cache_key] = text
+    if embedding is not None:
+        _semantic_cache.add(namespace, embedding, source_text, source_digest, text)
+    return text
+
+
+# 야간 리포트 등 여러 글을 한꺼번에 분석할 때의 동시 호출 수 (API 레이트 리밋 보호)
+GEMINI_ANALYZE_CONCURRENCY = int(os.getenv("GEMINI_ANALYZE_CONCURRENCY", "4"))
+
+
+async def analyze_blog_posts_batch(
+    items: List[Tuple[str, str, str]],
+) -> List[Union[str, Exception]]:
+    """
+    (blog_text, core_keyword, blog_url) 목록을 마크다운 분석한다. (비대화형 일괄 처리용)
+    동시에 GEMINI_ANALYZE_CONCURRENCY 개까지만 호출하고, 결과는 입력과 같은 순서로 돌려준다.
+    실패한 항목 자리에는 예외 객체가 들어간다. (하나가 실패해도 나머지는 계속 진행)
+    """
+    sem = asyncio.Semaphore(GEMINI_ANALYZE_CONCURRENCY)
+
+    async def _one(blog_text: str, core_keyword: str, blog_url: str) -> str:
+        async with sem:
+            return await analyze_blog_post(blog_text, core_keyword, blog_url)
+
+    return await asyncio.gather(
+        *(_one(*item) for item in items),
+        return_exceptions=True,
+    )
+
 
 # ==========================
 # 4) 네이버 검색 순위 모니터링 (웹/블로그)
 # ==========================
+_LOGNO_QS_RE = re.compile(r"[?&]logNo=(\d+)")
+_LOGNO_PATH_RE = re.compile(r"[^?#]*/(\d+)/?(?:[?#]|$)")
+
+
 def _extract_logno_from_url(url: str) -> Optional[str]:
     """
     네이버 블로그 URL에서 logNo(글 번호)를 추출한다.
@@ -550,6 +1059,11 @@ def _extract_logno_from_url(url: str) -> Optional[str]:
       - https://blog.naver.com/xxx/224060246982
       - https://blog.naver.com/PostView.naver?blogId=xxx&logNo=224060246982
     """
+    # 흔한 두 형태(쿼리스트링 logNo=, 경로 마지막 숫자)는 정규식으로 먼저 확인한다.
+    m = _LOGNO_QS_RE.search(url) or _LOGNO_PATH_RE.match(url)
+    if m:
+        return m.group(1)
+
     parsed = urlparse(url)
     qs = parse_qs(parsed.query)
     if "logNo" in qs and qs["logNo"]:
@@ -565,27 +1079,55 @@ def _extract_logno_from_url(url: str) -> Optional[str]:
     return None
 
 
-def _call_naver_search_api(
+# ---- 네이버 검색 결과 캐시 / 동시 호출 제한 ----
+# 모니터링 주기마다 같은 키워드를 다시 검색하는 경우가 많아서 (search_type, query, display, start) 로 짧게 캐시한다.
+# 여러 키워드를 한꺼번에 확인할 때 API 쿼터를 넘지 않도록
+# - 동시 호출 수는 NAVER_SEARCH_CONCURRENCY 개까지
+# - 요청 시작 간격은 최소 1/NAVER_SEARCH_QPS 초 (기본 초당 10회, 재시도 요청도 포함)
+NAVER_SEARCH_CACHE_TTL = int(os.getenv("NAVER_SEARCH_CACHE_TTL", "300"))
+NAVER_SEARCH_CONCURRENCY = int(os.getenv("NAVER_SEARCH_CONCURRENCY", "8"))
+NAVER_SEARCH_QPS = float(os.getenv("NAVER_SEARCH_QPS", "10"))
+_naver_search_cache: TTLCache = TTLCache(maxsize=1024, ttl=NAVER_SEARCH_CACHE_TTL)
+_naver_search_sem = asyncio.Semaphore(NAVER_SEARCH_CONCURRENCY)
+_naver_rate_lock = asyncio.Lock()
+_naver_next_slot = 0.0
+
+
+@asynccontextmanager
+async def _naver_search_slot() -> AsyncIterator[None]:
+    """동시 호출 슬롯을 잡은 뒤, 직전 요청과 최소 간격이 지나면 요청을 보내게 한다."""
+    global _naver_next_slot
+    async with _naver_search_sem:
+        if NAVER_SEARCH_QPS > 0:
+            # 다음 요청 시각을 lock 안에서 예약만 하고, 대기는 lock 밖에서 한다.
+            async with _naver_rate_lock:
+                now = time.monotonic()
+                start_at = max(now, _naver_next_slot)
+                _naver_next_slot = start_at + 1.0 / NAVER_SEARCH_QPS
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+        yield
+
+
+async def _call_naver_search_api(
     search_type: str, query: str, display: int = 10, start: int = 1
 ) -> Dict[str, Any]:
     """
     네이버 검색 API 호출
     - search_type: "web" 또는 "blog"
     """
-    if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
+    if not _NAVER_HEADERS:
         raise RuntimeError("NAVER_CLIENT_ID / NAVER_CLIENT_SECRET 환경변수가 없습니다.")
 
-    if search_type == "web":
-        url = "https://openapi.naver.com/v1/search/webkr.json"
-    elif search_type == "blog":
-        url = "https://openapi.naver.com/v1/search/blog.json"
-    else:
+    path = _NAVER_SEARCH_PATHS.get(search_type)
+    if path is None:
         raise ValueError("search_type 은 'web' 또는 'blog' 이어야 합니다.")
 
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
-    }
+    cache_key = (search_type, query, display, start)
+    cached = _naver_search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     params = {
         "query": query,
         "display": display,
@@ -593,9 +1135,11 @@ def _call_naver_search_api(
         "sort": "sim",  # 정확도순
     }
 
-    resp = requests.get(url, headers=headers, params=params, timeout=10)
+    resp = await _get_with_retry(_naver_http, path, params=params, limiter=_naver_search_slot)
     resp.raise_for_status()
-    return resp.json()
+    data = resp.json()
+    _naver_search_cache[cache_key] = data
+    return data
 
 
 def _find_rank_in_items(items: List[Dict[str, Any]], target_logno: str) -> Optional[int]:
@@ -610,7 +1154,7 @@ def _find_rank_in_items(items: List[Dict[str, Any]], target_logno: str) -> Optio
     return None
 
 
-def check_naver_rank(
+async def check_naver_rank(
     keyword: str,
     blog_url: str,
     max_rank_to_check: int = 10,
@@ -633,35 +1177,61 @@ def check_naver_rank(
     if not target_logno:
         raise RuntimeError("블로그 URL에서 글 번호(logNo)를 추출할 수 없습니다.")
 
+    return await _check_rank_for_logno(keyword, blog_url, target_logno, max_rank_to_check)
+
+
+async def check_naver_ranks_bulk(
+    keywords: List[str],
+    blog_url: str,
+    max_rank_to_check: int = 10,
+) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    한 블로그 글에 대해 여러 키워드의 순위를 한꺼번에 확인한다.
+    키워드별 검색은 동시에 보내되, 전체 동시 호출 수는 NAVER_SEARCH_CONCURRENCY 로 제한된다.
+
+    반환: {keyword: check_naver_rank() 와 같은 형태의 dict}
+    """
+    target_logno = _extract_logno_from_url(blog_url)
+    if not target_logno:
+        raise RuntimeError("블로그 URL에서 글 번호(logNo)를 추출할 수 없습니다.")
+
+    unique_keywords = list(dict.fromkeys(kw.strip() for kw in keywords if kw and kw.strip()))
+    results = await asyncio.gather(
+        *(
+            _check_rank_for_logno(kw, blog_url, target_logno, max_rank_to_check)
+            for kw in unique_keywords
+        )
+    )
+    return dict(zip(unique_keywords, results))
+
+
+async def _check_rank_for_logno(
+    keyword: str,
+    blog_url: str,
+    target_logno: str,
+    max_rank_to_check: int,
+) -> Dict[str, Optional[int]]:
     # 웹검색 / 블로그 검색 각각 상위 N위까지 확인
-    web_rank: Optional[int] = None
-    blog_rank: Optional[int] = None
+    # 두 호출은 서로 독립적이므로 동시에 보낸다. (소요 시간 ≈ 둘 중 느린 쪽)
+    blog_json, web_json = await asyncio.gather(
+        _call_naver_search_api(search_type="blog", query=keyword, display=max_rank_to_check, start=1),
+        _call_naver_search_api(search_type="web", query=keyword, display=max_rank_to_check, start=1),
+        return_exceptions=True,
+    )
 
     # 블로그 검색
-    try:
-        blog_json = _call_naver_search_api(
-            search_type="blog",
-            query=keyword,
-            display=max_rank_to_check,
-            start=1,
-        )
-        blog_items = blog_json.get("items", [])
-        blog_rank = _find_rank_in_items(blog_items, target_logno)
-    except Exception as e:
-        print(f"[WARN] 네이버 블로그 검색 호출 실패: {e}")
+    blog_rank: Optional[int] = None
+    if isinstance(blog_json, Exception):
+        print(f"[WARN] 네이버 블로그 검색 호출 실패: {blog_json}")
+    else:
+        blog_rank = _find_rank_in_items(blog_json.get("items", []), target_logno)
 
     # 웹 검색
-    try:
-        web_json = _call_naver_search_api(
-            search_type="web",
-            query=keyword,
-            display=max_rank_to_check,
-            start=1,
-        )
-        web_items = web_json.get("items", [])
-        web_rank = _find_rank_in_items(web_items, target_logno)
-    except Exception as e:
-        print(f"[WARN] 네이버 웹 검색 호출 실패: {e}")
+    web_rank: Optional[int] = None
+    if isinstance(web_json, Exception):
+        print(f"[WARN] 네이버 웹 검색 호출 실패: {web_json}")
+    else:
+        web_rank = _find_rank_in_items(web_json.get("items", []), target_logno)
 
     return {
         "keyword": keyword,
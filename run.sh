@@ -0,0 +1,18 @@
+#!/usr/bin/env sh
+# 운영 실행 스크립트
+# - gunicorn 이 워커 프로세스를 관리하고, 각 워커는 UvicornWorker 로 ASGI 앱을 띄운다.
+# - UvicornWorker 는 loop/http 를 auto 로 잡으므로 uvloop, httptools 가 설치돼 있으면 그것을 쓴다.
+# - async 워커이므로 --threads 는 쓰지 않는다.
+# - 테이블 생성이 필요하면 한 번만 RUN_CREATE_ALL=1 로 실행 (워커마다 DDL 을 돌리지 않도록 기본은 꺼짐)
+set -eu
+
+cd "$(dirname "$0")"
+
+WORKERS="${WEB_CONCURRENCY:-$(nproc 2>/dev/null || echo 2)}"
+
+exec gunicorn app.main:app \
+    --workers "$WORKERS" \
+    --worker-class uvicorn_worker.UvicornWorker \
+    --bind "${BIND:-0.0.0.0:8000}" \
+    --keep-alive 5 \
+    "$@"